@@ -0,0 +1,193 @@
+"""
+Local stand-ins for the Facebook Graph API and the Anthropic Messages API
+Serve realistic response shapes with configurable latency so tool benchmarks
+measure our code, not the network.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+ACCOUNT_METRICS = [
+    "impressions", "reach", "profile_views", "website_clicks", "email_contacts",
+    "phone_call_clicks", "get_directions_clicks", "follower_count",
+]
+
+# Low usage, like a healthy app: the quota scheduler parses it but does not slow down
+APP_USAGE = '{"call_count":3,"total_cputime":1,"total_time":2}'
+
+HASHTAGS = ["#foodie", "#burger", "#streetfood", "#dinner", "#localeats", "#weekend", "#brunch"]
+
+
+class Latency:
+    """Simulated upstream latency: a gaussian around `mean_ms`, never negative"""
+
+    def __init__(self, mean_ms: float, jitter_ms: float):
+        self.mean = mean_ms / 1000
+        self.jitter = jitter_ms / 1000
+
+    async def wait(self):
+        if self.mean or self.jitter:
+            await asyncio.sleep(max(0.0, random.gauss(self.mean, self.jitter)))
+
+
+def daily_values(days: int, low: int, high: int) -> list:
+    """Graph-style daily values ending today"""
+    today = datetime.now(timezone.utc).replace(hour=7, minute=0, second=0, microsecond=0)
+    return [
+        {
+            "value": random.randint(low, high),
+            "end_time": (today - timedelta(days=days - i - 1)).strftime("%Y-%m-%dT%H:%M:%S+0000"),
+        }
+        for i in range(days)
+    ]
+
+
+def paged(request: Request, items_total: int, make_item) -> dict:
+    """Cursor-paged edge response (limit/after), like /media and /posts"""
+    limit = int(request.query_params.get("limit", 25))
+    offset = int(request.query_params.get("after", 0))
+    end = min(offset + limit, items_total)
+    response = {"data": [make_item(i) for i in range(offset, end)]}
+    if end < items_total:
+        response["paging"] = {"cursors": {"after": str(end)}, "next": f"{request.url}&after={end}"}
+    return response
+
+
+def instagram_media(i: int) -> dict:
+    timestamp = datetime.now(timezone.utc) - timedelta(hours=7 * i)
+    return {
+        "id": f"bench_ig_{i + 1}",
+        "caption": f"Bench post {i + 1} {' '.join(random.sample(HASHTAGS, 3))}",
+        "media_type": "IMAGE",
+        "media_url": f"https://example.com/media/{i + 1}.jpg",
+        "permalink": f"https://instagram.com/p/bench{i + 1}",
+        "timestamp": timestamp.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+        "like_count": random.randint(10, 500),
+        "comments_count": random.randint(0, 50),
+        "insights": {"data": [
+            {"name": "impressions", "values": [{"value": random.randint(1000, 10000)}]},
+            {"name": "reach", "values": [{"value": random.randint(500, 8000)}]},
+            {"name": "engagement", "values": [{"value": random.randint(20, 600)}]},
+            {"name": "saved", "values": [{"value": random.randint(0, 30)}]},
+        ]},
+    }
+
+
+def facebook_post(i: int) -> dict:
+    created = datetime.now(timezone.utc) - timedelta(hours=11 * i)
+    return {
+        "id": f"bench_page_{i + 1}",
+        "message": f"Bench page post {i + 1}",
+        "created_time": created.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+        "permalink_url": f"https://facebook.com/bench/posts/{i + 1}",
+        "status_type": "added_photos",
+        "shares": {"count": random.randint(0, 40)},
+        "reactions": {"summary": {"total_count": random.randint(10, 400)}},
+        "comments": {"summary": {"total_count": random.randint(0, 60)}},
+        "insights": {"data": [
+            {"name": "post_impressions", "values": [{"value": random.randint(1000, 12000)}]},
+            {"name": "post_impressions_unique", "values": [{"value": random.randint(500, 9000)}]},
+        ]},
+    }
+
+
+def create_graph_app(latency: Latency, items_total: int) -> Starlette:
+    """Fake Graph API: insights, media, posts and demographics; counts requests in app.state"""
+
+    async def node_edge(request: Request) -> JSONResponse:
+        request.app.state.requests += 1
+        await latency.wait()
+        response = graph_response(request)
+        response.headers["X-App-Usage"] = APP_USAGE
+        return response
+
+    def graph_response(request: Request) -> JSONResponse:
+        edge = request.path_params["edge"]
+        metric = request.query_params.get("metric", "")
+
+        if edge == "media":
+            return JSONResponse(paged(request, items_total, instagram_media))
+        if edge == "posts":
+            return JSONResponse(paged(request, items_total, facebook_post))
+        if edge != "insights":
+            return JSONResponse({"error": {"message": f"Unknown edge {edge}"}}, status_code=400)
+
+        if "audience_city" in metric:
+            return JSONResponse({"data": [
+                {"name": "audience_city", "period": "lifetime", "values": [{"value": {
+                    f"City {i}, Region": random.randint(10, 2000) for i in range(45)
+                }}]},
+                {"name": "audience_country", "period": "lifetime", "values": [{"value": {
+                    code: random.randint(10, 5000) for code in ["US", "RO", "GB", "DE", "FR", "IT", "ES", "CA"]
+                }}]},
+                {"name": "audience_gender_age", "period": "lifetime", "values": [{"value": {
+                    f"{g}.{age}": random.randint(10, 3000)
+                    for g in "FMU" for age in ["13-17", "18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
+                }}]},
+            ]})
+
+        days = 30
+        return JSONResponse({"data": [
+            {"name": name, "period": "day", "values": daily_values(days, 10, 5000)}
+            for name in metric.split(",") if name
+        ]})
+
+    app = Starlette(routes=[Route("/{version}/{node}/{edge}", node_edge, methods=["GET"])])
+    app.state.requests = 0
+    return app
+
+
+def create_anthropic_app(latency: Latency) -> Starlette:
+    """Fake Anthropic Messages API; counts requests in app.state"""
+
+    async def messages(request: Request) -> JSONResponse:
+        request.app.state.requests += 1
+        body = await request.json()
+        await latency.wait()
+        prompt = body["messages"][0]["content"]
+        text = "Fresh off the grill and ready for you! " + " ".join(random.sample(HASHTAGS, 5))
+        return JSONResponse({
+            "id": f"msg_bench_{random.getrandbits(32):08x}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-3.5-sonnet"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": max(1, len(prompt) // 4), "output_tokens": max(1, len(text) // 4)},
+        })
+
+    app = Starlette(routes=[Route("/v1/messages", messages, methods=["POST"])])
+    app.state.requests = 0
+    return app
+
+
+class BackgroundServer:
+    """Run an ASGI app with uvicorn in a daemon thread (own event loop)"""
+
+    def __init__(self, app: Starlette, port: int):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        deadline = time.time() + 10
+        while not self.server.started:
+            if time.time() > deadline:
+                raise RuntimeError("Fake server did not start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        if self.thread:
+            self.thread.join(timeout=5)
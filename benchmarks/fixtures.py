@@ -0,0 +1,217 @@
+"""
+Seeded benchmark fixtures
+Fills the benchmark Postgres with a realistic, reproducible data set at a chosen
+scale (number of Instagram posts).
+
+Rows are generated server-side with generate_series, so 1M posts seed in minutes
+rather than hours of client round trips.
+"""
+
+import os
+import json
+import random
+import importlib.util
+from datetime import date, timedelta
+from typing import Dict, Any
+import asyncpg
+
+INSTAGRAM_ACCOUNT_ID = "bench_instagram_account"
+FACEBOOK_PAGE_ID = "bench_facebook_page"
+
+DEMOGRAPHICS_MODULE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "services", "mcp-instagram-analytics", "demographics.py"
+)
+
+# Tables the benchmark writes to; truncated before seeding
+BENCH_TABLES = [
+    "campaign_posts", "campaign_performance", "instagram_posts", "instagram_insights",
+    "facebook_posts", "facebook_page_insights", "generated_content", "media_assets",
+    "social_accounts", "instagram_posts_monthly", "instagram_hashtags_monthly",
+    "instagram_insights_monthly", "instagram_demographics_archive",
+]
+
+
+async def seed_postgres(database_url: str, scale: int, seed: float = 0.42) -> Dict[str, Any]:
+    """
+    Reset and seed the benchmark database.
+
+    `scale` Instagram posts spread over two years, half as many Facebook posts,
+    two years of daily insights and demographics snapshots, 100 campaigns of 50 posts and 1000 media assets.
+    Returns ids the benchmark cases need.
+    """
+    conn = await asyncpg.connect(database_url)
+    try:
+        await conn.execute(f"TRUNCATE {', '.join(BENCH_TABLES)} CASCADE")
+        await conn.execute("SELECT setseed($1)", seed)
+
+        instagram_uuid = await conn.fetchval("""
+            INSERT INTO social_accounts (platform, account_id, account_name, is_active)
+            VALUES ('instagram', $1, 'Bench Instagram', true) RETURNING id
+        """, INSTAGRAM_ACCOUNT_ID)
+        facebook_uuid = await conn.fetchval("""
+            INSERT INTO social_accounts (platform, account_id, account_name, is_active)
+            VALUES ('facebook', $1, 'Bench Facebook', true) RETURNING id
+        """, FACEBOOK_PAGE_ID)
+
+        await conn.execute("""
+            INSERT INTO instagram_posts (
+                post_id, account_id, caption, media_type, media_url, permalink, timestamp,
+                like_count, comment_count, reach, impressions, saved_count, hashtags
+            )
+            SELECT
+                'bench_ig_' || g,
+                $1,
+                'Bench post ' || g,
+                (ARRAY['IMAGE', 'VIDEO', 'CAROUSEL_ALBUM'])[1 + g % 3],
+                'https://example.com/media/' || g || '.jpg',
+                'https://instagram.com/p/bench' || g,
+                NOW() - random() * INTERVAL '730 days',
+                (random() * 500)::int,
+                (random() * 50)::int,
+                (random() * 8000)::int,
+                1000 + (random() * 10000)::int,
+                (random() * 30)::int,
+                ARRAY['#tag' || (g % 200), '#tag' || ((g * 7) % 200), '#foodie']
+            FROM generate_series(1, $2) g
+        """, instagram_uuid, scale)
+
+        await conn.execute("""
+            INSERT INTO facebook_posts (
+                post_id, account_id, message, post_type, created_time,
+                reactions_count, comments_count, shares_count, reach, impressions,
+                engagement_rate, permalink_url
+            )
+            SELECT
+                'bench_page_' || g,
+                $1,
+                'Bench page post ' || g,
+                'added_photos',
+                NOW() - random() * INTERVAL '730 days',
+                (random() * 400)::int,
+                (random() * 60)::int,
+                (random() * 40)::int,
+                (random() * 9000)::int,
+                1000 + (random() * 12000)::int,
+                (random() * 10)::numeric(5,2),
+                'https://facebook.com/bench/posts/' || g
+            FROM generate_series(1, GREATEST($2 / 2, 1)) g
+        """, facebook_uuid, scale)
+
+        await conn.execute("""
+            INSERT INTO instagram_insights (
+                account_id, date, followers_count, impressions, reach, profile_views,
+                website_clicks, email_contacts, phone_calls, get_directions_clicks
+            )
+            SELECT $1, CURRENT_DATE - d, 5000 + d, (random() * 20000)::int, (random() * 15000)::int,
+                (random() * 500)::int, (random() * 80)::int, (random() * 10)::int,
+                (random() * 10)::int, (random() * 30)::int
+            FROM generate_series(1, 730) d
+        """, instagram_uuid)
+
+        await seed_demographics(conn, instagram_uuid, 730, seed)
+
+        await conn.execute("""
+            INSERT INTO facebook_page_insights (
+                account_id, date, page_views, page_likes, page_engaged_users,
+                page_impressions, page_reach, post_engagements
+            )
+            SELECT $1, CURRENT_DATE - d, (random() * 900)::int, 8000 + d, (random() * 700)::int,
+                (random() * 25000)::int, (random() * 18000)::int, (random() * 1500)::int
+            FROM generate_series(1, 730) d
+        """, facebook_uuid)
+
+        # 100 campaigns of 50 Instagram posts each, totals summed from campaign_posts
+        await conn.execute("""
+            INSERT INTO campaign_performance (
+                campaign_name, platforms, post_ids, start_date, end_date,
+                total_impressions, total_reach, total_engagement, total_clicks, engagement_rate
+            )
+            SELECT 'Bench campaign ' || c, '{}', '{}', CURRENT_DATE - 30, CURRENT_DATE, 0, 0, 0, 0, 0
+            FROM generate_series(1, 100) c
+        """)
+        await conn.execute("""
+            INSERT INTO campaign_posts (campaign_id, platform, post_id, impressions, reach, engagement)
+            SELECT c.id, 'instagram', p.post_id, p.impressions, p.reach,
+                p.like_count + p.comment_count + p.saved_count + p.shares_count
+            FROM (SELECT id, row_number() OVER (ORDER BY id) AS n FROM campaign_performance) c
+            CROSS JOIN generate_series(1, 50) k
+            JOIN instagram_posts p ON p.post_id = 'bench_ig_' || (((c.n - 1) * 50 + k) % $1 + 1)
+            ON CONFLICT DO NOTHING
+        """, scale)
+        await conn.execute("""
+            UPDATE campaign_performance c SET
+                platforms = ARRAY['instagram'],
+                post_ids = t.post_ids,
+                total_impressions = t.impressions,
+                total_reach = t.reach,
+                total_engagement = t.engagement,
+                engagement_rate = campaign_engagement_rate(t.engagement, t.impressions)
+            FROM (
+                SELECT campaign_id, array_agg(post_id) AS post_ids, SUM(impressions) AS impressions,
+                    SUM(reach) AS reach, SUM(engagement) AS engagement
+                FROM campaign_posts GROUP BY campaign_id
+            ) t
+            WHERE c.id = t.campaign_id
+        """)
+
+        await conn.execute("""
+            INSERT INTO media_assets (file_name, file_path, media_type, mime_type, file_size_bytes,
+                width, height, processed, watermarked, optimized)
+            SELECT 'bench_' || g || '.jpg', 'uploads/bench_' || g || '.jpg', 'image', 'image/jpeg',
+                (200000 + random() * 5000000)::bigint, 4032, 3024, g % 4 <> 0, g % 4 <> 0, g % 4 <> 0
+            FROM generate_series(1, 1000) g
+        """)
+
+        # Seeded history lands in the default partitions; give every month its own, as the daily job would
+        await conn.execute("SELECT run_partition_maintenance()")
+        await conn.execute("ANALYZE")
+
+        campaign_id = await conn.fetchval("SELECT id::text FROM campaign_performance ORDER BY campaign_name LIMIT 1")
+        return {
+            "scale": scale,
+            "instagram_account_id": INSTAGRAM_ACCOUNT_ID,
+            "facebook_page_id": FACEBOOK_PAGE_ID,
+            "campaign_id": campaign_id,
+        }
+    finally:
+        await conn.close()
+
+
+async def seed_demographics(conn: asyncpg.Connection, account_uuid, days: int, seed: float):
+    """Daily encoded demographics snapshots with a slowly drifting audience"""
+    spec = importlib.util.spec_from_file_location("bench_demographics", DEMOGRAPHICS_MODULE)
+    demographics_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(demographics_module)
+
+    rng = random.Random(seed)
+    cities = [f"City {i}, Region" for i in range(120)]
+    audience = {
+        "cities": {c: rng.randint(10, 2000) for c in rng.sample(cities, 45)},
+        "countries": {c: rng.randint(100, 5000) for c in ["US", "RO", "GB", "DE", "FR", "IT", "ES", "CA"]},
+        "gender_age": {
+            f"{g}.{age}": rng.randint(10, 3000)
+            for g in "FMU" for age in ["13-17", "18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
+        },
+    }
+
+    rows = []
+    state = None
+    base_date = None
+    for d in range(days, 0, -1):
+        snapshot_date = date.today() - timedelta(days=d)
+        for counts in audience.values():
+            for key in rng.sample(list(counts), max(1, len(counts) // 5)):
+                counts[key] = max(1, counts[key] + rng.randint(-20, 30))
+        # Occasionally a city drops out of the top 45 and another takes its place
+        if rng.random() < 0.1:
+            audience["cities"].pop(rng.choice(list(audience["cities"])))
+            audience["cities"][rng.choice([c for c in cities if c not in audience["cities"]])] = rng.randint(10, 200)
+
+        encoded, state = demographics_module.encode_snapshot(state, audience, base_date, str(snapshot_date))
+        rows.append((account_uuid, snapshot_date, json.dumps(encoded, separators=(",", ":"))))
+        base_date = str(snapshot_date)
+
+    await conn.executemany("""
+        UPDATE instagram_insights SET audience_demographics = $3::jsonb
+        WHERE account_id = $1 AND date = $2
+    """, rows)
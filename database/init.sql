@@ -27,15 +27,17 @@ CREATE TABLE social_accounts (
 -- INSTAGRAM ANALYTICS
 -- ============================================
 
+-- instagram_posts, instagram_insights and sentiment_analysis are partitioned
+-- by month; see PARTITION MAINTENANCE & RETENTION below
 CREATE TABLE instagram_posts (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    post_id VARCHAR(255) UNIQUE NOT NULL,
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    post_id VARCHAR(255) NOT NULL,
     account_id UUID REFERENCES social_accounts(id),
     caption TEXT,
     media_type VARCHAR(50), -- IMAGE, VIDEO, CAROUSEL
     media_url TEXT,
     permalink TEXT,
-    timestamp TIMESTAMP,
+    timestamp TIMESTAMP NOT NULL,
     like_count INTEGER DEFAULT 0,
     comment_count INTEGER DEFAULT 0,
     reach INTEGER DEFAULT 0,
@@ -45,11 +47,13 @@ CREATE TABLE instagram_posts (
     shares_count INTEGER DEFAULT 0,
     hashtags TEXT[],
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (post_id, timestamp) -- unique keys must include the partition key
+) PARTITION BY RANGE (timestamp);
+CREATE TABLE instagram_posts_default PARTITION OF instagram_posts DEFAULT;
 
 CREATE TABLE instagram_insights (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     account_id UUID REFERENCES social_accounts(id),
     date DATE NOT NULL,
     followers_count INTEGER,
@@ -62,8 +66,10 @@ CREATE TABLE instagram_insights (
     get_directions_clicks INTEGER,
     audience_demographics JSONB,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, date),
     UNIQUE(account_id, date)
-);
+) PARTITION BY RANGE (date);
+CREATE TABLE instagram_insights_default PARTITION OF instagram_insights DEFAULT;
 
 CREATE TABLE instagram_stories (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -158,7 +164,7 @@ CREATE TABLE tiktok_viral_content (
 -- ============================================
 
 CREATE TABLE sentiment_analysis (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     source_platform VARCHAR(50), -- instagram, facebook, tiktok
     source_id VARCHAR(255), -- post_id, comment_id, etc
     text_content TEXT,
@@ -166,8 +172,10 @@ CREATE TABLE sentiment_analysis (
     sentiment_score DECIMAL(5,4), -- -1 to 1
     confidence DECIMAL(5,4),
     emotions JSONB, -- {joy: 0.8, anger: 0.1, etc}
-    analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    analyzed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, analyzed_at)
+) PARTITION BY RANGE (analyzed_at);
+CREATE TABLE sentiment_analysis_default PARTITION OF sentiment_analysis DEFAULT;
 
 -- ============================================
 -- TREND DETECTION & AGGREGATION
@@ -258,21 +266,37 @@ CREATE TABLE campaign_performance (
     end_date DATE,
     total_impressions BIGINT,
     total_reach BIGINT,
-    total_engagement INTEGER,
+    total_engagement BIGINT,
     total_clicks INTEGER,
     engagement_rate DECIMAL(5,2),
     roi_score DECIMAL(10,2),
     metadata JSONB,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Posts belonging to a campaign and the metrics last counted into its totals
+CREATE TABLE campaign_posts (
+    campaign_id UUID REFERENCES campaign_performance(id) ON DELETE CASCADE,
+    platform VARCHAR(50) NOT NULL, -- instagram, facebook
+    post_id VARCHAR(255) NOT NULL,
+    impressions BIGINT DEFAULT 0,
+    reach BIGINT DEFAULT 0,
+    engagement BIGINT DEFAULT 0,
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (campaign_id, platform, post_id)
 );
 
 -- ============================================
 -- INDEXES for Performance
 -- ============================================
 
-CREATE INDEX idx_instagram_posts_timestamp ON instagram_posts(timestamp DESC);
-CREATE INDEX idx_instagram_posts_engagement ON instagram_posts(engagement_rate DESC);
-CREATE INDEX idx_instagram_insights_date ON instagram_insights(date DESC);
+-- Account + time window with the metrics the tools sort and average on
+CREATE INDEX idx_instagram_posts_account_time ON instagram_posts(account_id, timestamp DESC)
+    INCLUDE (engagement_rate, reach, impressions, like_count, comment_count, saved_count);
+CREATE INDEX idx_instagram_posts_hashtags ON instagram_posts USING GIN (hashtags);
+CREATE INDEX idx_instagram_insights_keyframes ON instagram_insights(account_id, date)
+    WHERE audience_demographics->>'type' = 'keyframe';
 
 CREATE INDEX idx_facebook_posts_created_time ON facebook_posts(created_time DESC);
 CREATE INDEX idx_facebook_posts_engagement ON facebook_posts(engagement_rate DESC);
@@ -281,8 +305,9 @@ CREATE INDEX idx_tiktok_trends_detected_at ON tiktok_trends(detected_at DESC);
 CREATE INDEX idx_tiktok_trends_score ON tiktok_trends(trending_score DESC);
 CREATE INDEX idx_tiktok_trends_category ON tiktok_trends(category);
 
-CREATE INDEX idx_sentiment_platform ON sentiment_analysis(source_platform, analyzed_at DESC);
-CREATE INDEX idx_sentiment_score ON sentiment_analysis(sentiment_score DESC);
+CREATE INDEX idx_sentiment_platform_time ON sentiment_analysis(source_platform, analyzed_at DESC)
+    INCLUDE (sentiment, sentiment_score, confidence);
+CREATE INDEX idx_sentiment_source ON sentiment_analysis(source_platform, source_id);
 
 CREATE INDEX idx_detected_trends_score ON detected_trends(trend_score DESC);
 CREATE INDEX idx_detected_trends_period ON detected_trends(time_period, start_date DESC);
@@ -290,6 +315,8 @@ CREATE INDEX idx_detected_trends_period ON detected_trends(time_period, start_da
 CREATE INDEX idx_scheduled_posts_time ON scheduled_posts(scheduled_time);
 CREATE INDEX idx_scheduled_posts_status ON scheduled_posts(status);
 
+CREATE INDEX idx_campaign_posts_post ON campaign_posts(platform, post_id);
+
 -- ============================================
 -- FUNCTIONS & TRIGGERS
 -- ============================================
@@ -326,6 +353,380 @@ $$ language 'plpgsql';
 CREATE TRIGGER calculate_instagram_engagement BEFORE INSERT OR UPDATE ON instagram_posts
     FOR EACH ROW EXECUTE FUNCTION calculate_engagement_rate();
 
+CREATE OR REPLACE FUNCTION campaign_engagement_rate(engagement NUMERIC, impressions NUMERIC)
+RETURNS DECIMAL(5,2) AS $$
+    SELECT CASE
+        WHEN impressions > 0 THEN LEAST(engagement * 100.0 / impressions, 999.99)::DECIMAL(5,2)
+        ELSE 0
+    END;
+$$ language 'sql' IMMUTABLE;
+
+-- Keep campaign totals up to date as post metrics change.
+-- Each campaign_posts row remembers the metrics last applied for that post,
+-- so an update only adds the difference instead of re-summing the campaign.
+CREATE OR REPLACE FUNCTION apply_post_metrics_to_campaigns()
+RETURNS TRIGGER AS $$
+DECLARE
+    post_platform TEXT := TG_ARGV[0];
+    new_impressions BIGINT := COALESCE(NEW.impressions, 0);
+    new_reach BIGINT := COALESCE(NEW.reach, 0);
+    new_engagement BIGINT;
+BEGIN
+    IF post_platform = 'instagram' THEN
+        new_engagement := COALESCE(NEW.like_count, 0) + COALESCE(NEW.comment_count, 0)
+            + COALESCE(NEW.saved_count, 0) + COALESCE(NEW.shares_count, 0);
+    ELSE
+        new_engagement := COALESCE(NEW.reactions_count, 0) + COALESCE(NEW.comments_count, 0)
+            + COALESCE(NEW.shares_count, 0);
+    END IF;
+
+    WITH changed AS (
+        UPDATE campaign_posts cp SET
+            impressions = new_impressions,
+            reach = new_reach,
+            engagement = new_engagement
+        FROM campaign_posts previous
+        WHERE cp.platform = post_platform
+        AND cp.post_id = NEW.post_id
+        AND previous.campaign_id = cp.campaign_id
+        AND previous.platform = cp.platform
+        AND previous.post_id = cp.post_id
+        AND (previous.impressions, previous.reach, previous.engagement)
+            IS DISTINCT FROM (new_impressions, new_reach, new_engagement)
+        RETURNING
+            cp.campaign_id,
+            new_impressions - previous.impressions AS delta_impressions,
+            new_reach - previous.reach AS delta_reach,
+            new_engagement - previous.engagement AS delta_engagement
+    )
+    UPDATE campaign_performance c SET
+        total_impressions = COALESCE(c.total_impressions, 0) + d.delta_impressions,
+        total_reach = COALESCE(c.total_reach, 0) + d.delta_reach,
+        total_engagement = COALESCE(c.total_engagement, 0) + d.delta_engagement,
+        engagement_rate = campaign_engagement_rate(
+            COALESCE(c.total_engagement, 0) + d.delta_engagement,
+            COALESCE(c.total_impressions, 0) + d.delta_impressions
+        ),
+        updated_at = CURRENT_TIMESTAMP
+    FROM changed d
+    WHERE c.id = d.campaign_id;
+
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_campaigns_from_instagram_posts AFTER INSERT OR UPDATE ON instagram_posts
+    FOR EACH ROW EXECUTE FUNCTION apply_post_metrics_to_campaigns('instagram');
+
+CREATE TRIGGER update_campaigns_from_facebook_posts AFTER INSERT OR UPDATE ON facebook_posts
+    FOR EACH ROW EXECUTE FUNCTION apply_post_metrics_to_campaigns('facebook');
+
+-- ============================================
+-- PARTITION MAINTENANCE & RETENTION
+-- ============================================
+-- instagram_posts, instagram_insights and sentiment_analysis are split into
+-- monthly range partitions (<table>_pYYYY_MM) plus a <table>_default catch-all.
+-- run_partition_maintenance(), run daily, creates upcoming months and rolls
+-- months older than the retention window into the aggregate tables below,
+-- then drops them, so queries only ever touch a bounded number of partitions.
+-- A month is compacted once: inserts older than the retention window are
+-- skipped (skip_rows_past_retention) and compaction never overwrites totals
+-- already recorded for a month.
+
+-- Which tables are partitioned, how long raw rows are kept and how they are compacted
+CREATE TABLE IF NOT EXISTS partition_policies (
+    table_name TEXT PRIMARY KEY,
+    partition_column TEXT NOT NULL,
+    retention_months INTEGER NOT NULL CHECK (retention_months >= 4), -- whole months of raw rows; tools read up to 90 days back
+    premake_months INTEGER NOT NULL DEFAULT 3, -- future months created ahead of time
+    compact_function TEXT -- called with (partition, month) before a partition is dropped
+);
+
+INSERT INTO partition_policies (table_name, partition_column, retention_months, premake_months, compact_function) VALUES
+    ('instagram_posts', 'timestamp', 24, 3, 'compact_instagram_posts'),
+    ('instagram_insights', 'date', 36, 3, 'compact_instagram_insights'),
+    ('sentiment_analysis', 'analyzed_at', 12, 3, 'compact_sentiment_analysis')
+ON CONFLICT (table_name) DO NOTHING;
+
+-- Compacted Instagram posts: monthly totals per account
+CREATE TABLE IF NOT EXISTS instagram_posts_monthly (
+    account_id UUID REFERENCES social_accounts(id),
+    month DATE NOT NULL,
+    post_count INTEGER NOT NULL,
+    total_likes BIGINT,
+    total_comments BIGINT,
+    total_saved BIGINT,
+    total_shares BIGINT,
+    total_reach BIGINT,
+    total_impressions BIGINT,
+    engagement_rate_sum NUMERIC, -- with engagement_rate_count gives the average rate
+    engagement_rate_count INTEGER,
+    PRIMARY KEY (account_id, month)
+);
+
+-- Compacted Instagram posts: monthly totals per account and hashtag (track_hashtag_performance)
+CREATE TABLE IF NOT EXISTS instagram_hashtags_monthly (
+    account_id UUID REFERENCES social_accounts(id),
+    month DATE NOT NULL,
+    hashtag TEXT NOT NULL,
+    post_count INTEGER NOT NULL,
+    engagement_rate_sum NUMERIC,
+    engagement_rate_count INTEGER,
+    total_reach BIGINT,
+    total_impressions BIGINT,
+    total_likes BIGINT,
+    total_comments BIGINT,
+    PRIMARY KEY (account_id, hashtag, month)
+);
+
+-- Compacted Instagram account insights: monthly totals per account
+CREATE TABLE IF NOT EXISTS instagram_insights_monthly (
+    account_id UUID REFERENCES social_accounts(id),
+    month DATE NOT NULL,
+    days INTEGER NOT NULL,
+    followers_count INTEGER, -- last known value in the month
+    impressions BIGINT,
+    reach BIGINT,
+    profile_views BIGINT,
+    website_clicks BIGINT,
+    email_contacts BIGINT,
+    phone_calls BIGINT,
+    get_directions_clicks BIGINT,
+    PRIMARY KEY (account_id, month)
+);
+
+-- Demographics keyframes from compacted months (history at monthly resolution)
+CREATE TABLE IF NOT EXISTS instagram_demographics_archive (
+    account_id UUID REFERENCES social_accounts(id),
+    date DATE NOT NULL,
+    audience_demographics JSONB NOT NULL,
+    PRIMARY KEY (account_id, date)
+);
+
+-- Compacted sentiment analysis: daily counts per platform and sentiment
+CREATE TABLE IF NOT EXISTS sentiment_analysis_daily (
+    source_platform VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,
+    sentiment VARCHAR(20) NOT NULL,
+    mentions INTEGER NOT NULL,
+    sentiment_score_sum NUMERIC,
+    confidence_sum NUMERIC,
+    PRIMARY KEY (source_platform, day, sentiment)
+);
+
+-- Create one month's partition. Rows for that month already caught by the
+-- default partition are moved into it, so this also adopts stray months.
+CREATE OR REPLACE FUNCTION create_monthly_partition(parent TEXT, month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    month_start DATE := date_trunc('month', month)::date;
+    month_end DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+    partition_name TEXT := format('%s_p%s', parent, to_char(date_trunc('month', month), 'YYYY_MM'));
+    key_column TEXT;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT p.partition_column INTO STRICT key_column FROM partition_policies p WHERE p.table_name = parent;
+
+    -- Built detached and attached after the move: attaching verifies the
+    -- default partition holds no rows for the month any more
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, parent);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM %I WHERE %I >= $1 AND %I < $2 RETURNING *) INSERT INTO %I SELECT * FROM moved',
+        parent || '_default', key_column, key_column, partition_name
+    ) USING month_start, month_end;
+    EXECUTE format(
+        'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        parent, partition_name, month_start, month_end
+    );
+
+    RETURN partition_name;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION compact_instagram_posts(part REGCLASS, month DATE)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format($sql$
+        INSERT INTO instagram_posts_monthly (
+            account_id, month, post_count, total_likes, total_comments, total_saved, total_shares,
+            total_reach, total_impressions, engagement_rate_sum, engagement_rate_count
+        )
+        SELECT account_id, $1, COUNT(*), SUM(like_count), SUM(comment_count), SUM(saved_count),
+            SUM(shares_count), SUM(reach), SUM(impressions), SUM(engagement_rate), COUNT(engagement_rate)
+        FROM %s
+        WHERE account_id IS NOT NULL
+        GROUP BY account_id
+        -- Totals already recorded for the month cover the full month; keep them
+        ON CONFLICT (account_id, month) DO NOTHING
+    $sql$, part) USING month;
+
+    EXECUTE format($sql$
+        INSERT INTO instagram_hashtags_monthly (
+            account_id, month, hashtag, post_count, engagement_rate_sum, engagement_rate_count,
+            total_reach, total_impressions, total_likes, total_comments
+        )
+        SELECT p.account_id, $1, h.hashtag, COUNT(*), SUM(p.engagement_rate), COUNT(p.engagement_rate),
+            SUM(p.reach), SUM(p.impressions), SUM(p.like_count), SUM(p.comment_count)
+        FROM %s p
+        CROSS JOIN LATERAL (SELECT DISTINCT unnest(p.hashtags) AS hashtag) h
+        WHERE p.account_id IS NOT NULL
+        GROUP BY p.account_id, h.hashtag
+        ON CONFLICT (account_id, hashtag, month) DO NOTHING
+    $sql$, part) USING month;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION compact_instagram_insights(part REGCLASS, month DATE)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format($sql$
+        INSERT INTO instagram_insights_monthly (
+            account_id, month, days, followers_count, impressions, reach, profile_views,
+            website_clicks, email_contacts, phone_calls, get_directions_clicks
+        )
+        SELECT account_id, $1, COUNT(*),
+            (array_agg(followers_count ORDER BY date DESC) FILTER (WHERE followers_count IS NOT NULL))[1],
+            SUM(impressions), SUM(reach), SUM(profile_views), SUM(website_clicks),
+            SUM(email_contacts), SUM(phone_calls), SUM(get_directions_clicks)
+        FROM %s
+        WHERE account_id IS NOT NULL
+        GROUP BY account_id
+        ON CONFLICT (account_id, month) DO NOTHING
+    $sql$, part) USING month;
+
+    -- Every month's snapshots start with a keyframe, so keyframes replay on their own
+    EXECUTE format($sql$
+        INSERT INTO instagram_demographics_archive (account_id, date, audience_demographics)
+        SELECT account_id, date, audience_demographics
+        FROM %s
+        WHERE account_id IS NOT NULL
+        AND audience_demographics->>'type' = 'keyframe'
+        ON CONFLICT (account_id, date) DO NOTHING
+    $sql$, part);
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION compact_sentiment_analysis(part REGCLASS, month DATE)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format($sql$
+        INSERT INTO sentiment_analysis_daily (
+            source_platform, day, sentiment, mentions, sentiment_score_sum, confidence_sum
+        )
+        SELECT COALESCE(source_platform, 'unknown'), analyzed_at::date, COALESCE(sentiment, 'unknown'),
+            COUNT(*), SUM(sentiment_score), SUM(confidence)
+        FROM %s
+        GROUP BY 1, 2, 3
+        ON CONFLICT (source_platform, day, sentiment) DO NOTHING
+    $sql$, part);
+END;
+$$ language 'plpgsql';
+
+-- Daily job: create upcoming partitions, adopt stray months from the default
+-- partitions, and compact + drop months past retention. Returns what it did
+-- (or would do, with dry_run).
+--
+--   SELECT * FROM run_partition_maintenance();
+CREATE OR REPLACE FUNCTION run_partition_maintenance(dry_run BOOLEAN DEFAULT false)
+RETURNS TABLE (parent_table TEXT, partition_name TEXT, action TEXT) AS $$
+DECLARE
+    policy RECORD;
+    part RECORD;
+    month DATE;
+    cutoff DATE;
+BEGIN
+    FOR policy IN SELECT * FROM partition_policies p ORDER BY p.table_name LOOP
+        parent_table := policy.table_name;
+
+        -- Months the default partition caught, then the current and upcoming months
+        FOR month IN EXECUTE format(
+            'SELECT DISTINCT date_trunc(''month'', %I)::date FROM %I
+             UNION
+             SELECT generate_series(date_trunc(''month'', CURRENT_DATE),
+                                    date_trunc(''month'', CURRENT_DATE) + make_interval(months => $1),
+                                    INTERVAL ''1 month'')::date
+             ORDER BY 1',
+            policy.partition_column, policy.table_name || '_default'
+        ) USING policy.premake_months LOOP
+            partition_name := format('%s_p%s', policy.table_name, to_char(month, 'YYYY_MM'));
+            IF to_regclass(partition_name) IS NULL THEN
+                IF NOT dry_run THEN
+                    PERFORM create_monthly_partition(policy.table_name, month);
+                END IF;
+                action := 'created';
+                RETURN NEXT;
+            END IF;
+        END LOOP;
+
+        cutoff := (date_trunc('month', CURRENT_DATE) - make_interval(months => policy.retention_months))::date;
+        FOR part IN
+            SELECT c.relname, to_date(right(c.relname, 7), 'YYYY_MM') AS month
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = policy.table_name::regclass
+            AND c.relname ~ '_p[0-9]{4}_[0-9]{2}$'
+            AND to_date(right(c.relname, 7), 'YYYY_MM') < cutoff
+            ORDER BY 2
+        LOOP
+            IF NOT dry_run THEN
+                IF policy.compact_function IS NOT NULL THEN
+                    EXECUTE format('SELECT %I($1::regclass, $2)', policy.compact_function)
+                        USING part.relname, part.month;
+                END IF;
+                EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', policy.table_name, part.relname);
+                EXECUTE format('DROP TABLE %I', part.relname);
+            END IF;
+            partition_name := part.relname;
+            action := 'compacted';
+            RETURN NEXT;
+        END LOOP;
+    END LOOP;
+END;
+$$ language 'plpgsql';
+
+-- BEFORE INSERT guard on the partitioned tables: drops rows older than the
+-- retention window (e.g. a re-fetched two-year-old post), which would
+-- otherwise land in the default partition and be counted twice next to the
+-- compacted totals for their month. Takes the table name as its argument.
+CREATE OR REPLACE FUNCTION skip_rows_past_retention()
+RETURNS TRIGGER AS $$
+DECLARE
+    policy RECORD;
+BEGIN
+    SELECT p.partition_column, p.retention_months INTO policy
+    FROM partition_policies p WHERE p.table_name = TG_ARGV[0];
+    IF FOUND AND (to_jsonb(NEW)->>policy.partition_column)::timestamp
+        < date_trunc('month', CURRENT_DATE) - make_interval(months => policy.retention_months) THEN
+        RETURN NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Every stored demographics snapshot, live or archived (get_demographics_trend)
+CREATE OR REPLACE VIEW instagram_demographics_snapshots AS
+    SELECT account_id, date, audience_demographics
+    FROM instagram_insights
+    WHERE audience_demographics IS NOT NULL
+    UNION ALL
+    SELECT account_id, date, audience_demographics
+    FROM instagram_demographics_archive;
+
+CREATE TRIGGER skip_instagram_posts_past_retention BEFORE INSERT ON instagram_posts
+    FOR EACH ROW EXECUTE FUNCTION skip_rows_past_retention('instagram_posts');
+
+CREATE TRIGGER skip_instagram_insights_past_retention BEFORE INSERT ON instagram_insights
+    FOR EACH ROW EXECUTE FUNCTION skip_rows_past_retention('instagram_insights');
+
+CREATE TRIGGER skip_sentiment_analysis_past_retention BEFORE INSERT ON sentiment_analysis
+    FOR EACH ROW EXECUTE FUNCTION skip_rows_past_retention('sentiment_analysis');
+
+-- Create the current and upcoming months
+SELECT * FROM run_partition_maintenance();
+
 -- ============================================
 -- SEED DATA (Optional)
 -- ============================================
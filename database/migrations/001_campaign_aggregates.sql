@@ -0,0 +1,94 @@
+-- ============================================
+-- MIGRATION 001: Incremental campaign aggregates
+-- ============================================
+-- Safe to run more than once. New databases get the same objects from init.sql.
+--
+--   docker exec -i postgres psql -U $POSTGRES_USER hospitality_marketing < database/migrations/001_campaign_aggregates.sql
+
+ALTER TABLE campaign_performance ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+-- Posts belonging to a campaign and the metrics last counted into its totals
+CREATE TABLE IF NOT EXISTS campaign_posts (
+    campaign_id UUID REFERENCES campaign_performance(id) ON DELETE CASCADE,
+    platform VARCHAR(50) NOT NULL, -- instagram, facebook
+    post_id VARCHAR(255) NOT NULL,
+    impressions BIGINT DEFAULT 0,
+    reach BIGINT DEFAULT 0,
+    engagement BIGINT DEFAULT 0,
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (campaign_id, platform, post_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_campaign_posts_post ON campaign_posts(platform, post_id);
+
+ALTER TABLE campaign_performance ALTER COLUMN total_engagement TYPE BIGINT;
+
+CREATE OR REPLACE FUNCTION campaign_engagement_rate(engagement NUMERIC, impressions NUMERIC)
+RETURNS DECIMAL(5,2) AS $$
+    SELECT CASE
+        WHEN impressions > 0 THEN LEAST(engagement * 100.0 / impressions, 999.99)::DECIMAL(5,2)
+        ELSE 0
+    END;
+$$ language 'sql' IMMUTABLE;
+
+-- Keep campaign totals up to date as post metrics change.
+-- Each campaign_posts row remembers the metrics last applied for that post,
+-- so an update only adds the difference instead of re-summing the campaign.
+CREATE OR REPLACE FUNCTION apply_post_metrics_to_campaigns()
+RETURNS TRIGGER AS $$
+DECLARE
+    post_platform TEXT := TG_ARGV[0];
+    new_impressions BIGINT := COALESCE(NEW.impressions, 0);
+    new_reach BIGINT := COALESCE(NEW.reach, 0);
+    new_engagement BIGINT;
+BEGIN
+    IF post_platform = 'instagram' THEN
+        new_engagement := COALESCE(NEW.like_count, 0) + COALESCE(NEW.comment_count, 0)
+            + COALESCE(NEW.saved_count, 0) + COALESCE(NEW.shares_count, 0);
+    ELSE
+        new_engagement := COALESCE(NEW.reactions_count, 0) + COALESCE(NEW.comments_count, 0)
+            + COALESCE(NEW.shares_count, 0);
+    END IF;
+
+    WITH changed AS (
+        UPDATE campaign_posts cp SET
+            impressions = new_impressions,
+            reach = new_reach,
+            engagement = new_engagement
+        FROM campaign_posts previous
+        WHERE cp.platform = post_platform
+        AND cp.post_id = NEW.post_id
+        AND previous.campaign_id = cp.campaign_id
+        AND previous.platform = cp.platform
+        AND previous.post_id = cp.post_id
+        AND (previous.impressions, previous.reach, previous.engagement)
+            IS DISTINCT FROM (new_impressions, new_reach, new_engagement)
+        RETURNING
+            cp.campaign_id,
+            new_impressions - previous.impressions AS delta_impressions,
+            new_reach - previous.reach AS delta_reach,
+            new_engagement - previous.engagement AS delta_engagement
+    )
+    UPDATE campaign_performance c SET
+        total_impressions = COALESCE(c.total_impressions, 0) + d.delta_impressions,
+        total_reach = COALESCE(c.total_reach, 0) + d.delta_reach,
+        total_engagement = COALESCE(c.total_engagement, 0) + d.delta_engagement,
+        engagement_rate = campaign_engagement_rate(
+            COALESCE(c.total_engagement, 0) + d.delta_engagement,
+            COALESCE(c.total_impressions, 0) + d.delta_impressions
+        ),
+        updated_at = CURRENT_TIMESTAMP
+    FROM changed d
+    WHERE c.id = d.campaign_id;
+
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_campaigns_from_instagram_posts ON instagram_posts;
+CREATE TRIGGER update_campaigns_from_instagram_posts AFTER INSERT OR UPDATE ON instagram_posts
+    FOR EACH ROW EXECUTE FUNCTION apply_post_metrics_to_campaigns('instagram');
+
+DROP TRIGGER IF EXISTS update_campaigns_from_facebook_posts ON facebook_posts;
+CREATE TRIGGER update_campaigns_from_facebook_posts AFTER INSERT OR UPDATE ON facebook_posts
+    FOR EACH ROW EXECUTE FUNCTION apply_post_metrics_to_campaigns('facebook');
@@ -0,0 +1,503 @@
+-- ============================================
+-- MIGRATION 002: Monthly partitions and retention
+-- ============================================
+-- Safe to run more than once. New databases get the same objects from init.sql.
+-- Converts instagram_posts, instagram_insights and sentiment_analysis to monthly
+-- range partitions, copying existing rows; the copy locks those tables, so run
+-- it while the MCP servers are stopped. Requires PostgreSQL 13 or newer.
+--
+--   docker exec -i postgres psql -U $POSTGRES_USER hospitality_marketing < database/migrations/002_monthly_partitions.sql
+
+-- ============================================
+-- PARTITION MAINTENANCE & RETENTION
+-- ============================================
+-- instagram_posts, instagram_insights and sentiment_analysis are split into
+-- monthly range partitions (<table>_pYYYY_MM) plus a <table>_default catch-all.
+-- run_partition_maintenance(), run daily, creates upcoming months and rolls
+-- months older than the retention window into the aggregate tables below,
+-- then drops them, so queries only ever touch a bounded number of partitions.
+-- A month is compacted once: inserts older than the retention window are
+-- skipped (skip_rows_past_retention) and compaction never overwrites totals
+-- already recorded for a month.
+
+-- Which tables are partitioned, how long raw rows are kept and how they are compacted
+CREATE TABLE IF NOT EXISTS partition_policies (
+    table_name TEXT PRIMARY KEY,
+    partition_column TEXT NOT NULL,
+    retention_months INTEGER NOT NULL CHECK (retention_months >= 4), -- whole months of raw rows; tools read up to 90 days back
+    premake_months INTEGER NOT NULL DEFAULT 3, -- future months created ahead of time
+    compact_function TEXT -- called with (partition, month) before a partition is dropped
+);
+
+INSERT INTO partition_policies (table_name, partition_column, retention_months, premake_months, compact_function) VALUES
+    ('instagram_posts', 'timestamp', 24, 3, 'compact_instagram_posts'),
+    ('instagram_insights', 'date', 36, 3, 'compact_instagram_insights'),
+    ('sentiment_analysis', 'analyzed_at', 12, 3, 'compact_sentiment_analysis')
+ON CONFLICT (table_name) DO NOTHING;
+
+-- Compacted Instagram posts: monthly totals per account
+CREATE TABLE IF NOT EXISTS instagram_posts_monthly (
+    account_id UUID REFERENCES social_accounts(id),
+    month DATE NOT NULL,
+    post_count INTEGER NOT NULL,
+    total_likes BIGINT,
+    total_comments BIGINT,
+    total_saved BIGINT,
+    total_shares BIGINT,
+    total_reach BIGINT,
+    total_impressions BIGINT,
+    engagement_rate_sum NUMERIC, -- with engagement_rate_count gives the average rate
+    engagement_rate_count INTEGER,
+    PRIMARY KEY (account_id, month)
+);
+
+-- Compacted Instagram posts: monthly totals per account and hashtag (track_hashtag_performance)
+CREATE TABLE IF NOT EXISTS instagram_hashtags_monthly (
+    account_id UUID REFERENCES social_accounts(id),
+    month DATE NOT NULL,
+    hashtag TEXT NOT NULL,
+    post_count INTEGER NOT NULL,
+    engagement_rate_sum NUMERIC,
+    engagement_rate_count INTEGER,
+    total_reach BIGINT,
+    total_impressions BIGINT,
+    total_likes BIGINT,
+    total_comments BIGINT,
+    PRIMARY KEY (account_id, hashtag, month)
+);
+
+-- Compacted Instagram account insights: monthly totals per account
+CREATE TABLE IF NOT EXISTS instagram_insights_monthly (
+    account_id UUID REFERENCES social_accounts(id),
+    month DATE NOT NULL,
+    days INTEGER NOT NULL,
+    followers_count INTEGER, -- last known value in the month
+    impressions BIGINT,
+    reach BIGINT,
+    profile_views BIGINT,
+    website_clicks BIGINT,
+    email_contacts BIGINT,
+    phone_calls BIGINT,
+    get_directions_clicks BIGINT,
+    PRIMARY KEY (account_id, month)
+);
+
+-- Demographics keyframes from compacted months (history at monthly resolution)
+CREATE TABLE IF NOT EXISTS instagram_demographics_archive (
+    account_id UUID REFERENCES social_accounts(id),
+    date DATE NOT NULL,
+    audience_demographics JSONB NOT NULL,
+    PRIMARY KEY (account_id, date)
+);
+
+-- Compacted sentiment analysis: daily counts per platform and sentiment
+CREATE TABLE IF NOT EXISTS sentiment_analysis_daily (
+    source_platform VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,
+    sentiment VARCHAR(20) NOT NULL,
+    mentions INTEGER NOT NULL,
+    sentiment_score_sum NUMERIC,
+    confidence_sum NUMERIC,
+    PRIMARY KEY (source_platform, day, sentiment)
+);
+
+-- Create one month's partition. Rows for that month already caught by the
+-- default partition are moved into it, so this also adopts stray months.
+CREATE OR REPLACE FUNCTION create_monthly_partition(parent TEXT, month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    month_start DATE := date_trunc('month', month)::date;
+    month_end DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+    partition_name TEXT := format('%s_p%s', parent, to_char(date_trunc('month', month), 'YYYY_MM'));
+    key_column TEXT;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT p.partition_column INTO STRICT key_column FROM partition_policies p WHERE p.table_name = parent;
+
+    -- Built detached and attached after the move: attaching verifies the
+    -- default partition holds no rows for the month any more
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, parent);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM %I WHERE %I >= $1 AND %I < $2 RETURNING *) INSERT INTO %I SELECT * FROM moved',
+        parent || '_default', key_column, key_column, partition_name
+    ) USING month_start, month_end;
+    EXECUTE format(
+        'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        parent, partition_name, month_start, month_end
+    );
+
+    RETURN partition_name;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION compact_instagram_posts(part REGCLASS, month DATE)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format($sql$
+        INSERT INTO instagram_posts_monthly (
+            account_id, month, post_count, total_likes, total_comments, total_saved, total_shares,
+            total_reach, total_impressions, engagement_rate_sum, engagement_rate_count
+        )
+        SELECT account_id, $1, COUNT(*), SUM(like_count), SUM(comment_count), SUM(saved_count),
+            SUM(shares_count), SUM(reach), SUM(impressions), SUM(engagement_rate), COUNT(engagement_rate)
+        FROM %s
+        WHERE account_id IS NOT NULL
+        GROUP BY account_id
+        -- Totals already recorded for the month cover the full month; keep them
+        ON CONFLICT (account_id, month) DO NOTHING
+    $sql$, part) USING month;
+
+    EXECUTE format($sql$
+        INSERT INTO instagram_hashtags_monthly (
+            account_id, month, hashtag, post_count, engagement_rate_sum, engagement_rate_count,
+            total_reach, total_impressions, total_likes, total_comments
+        )
+        SELECT p.account_id, $1, h.hashtag, COUNT(*), SUM(p.engagement_rate), COUNT(p.engagement_rate),
+            SUM(p.reach), SUM(p.impressions), SUM(p.like_count), SUM(p.comment_count)
+        FROM %s p
+        CROSS JOIN LATERAL (SELECT DISTINCT unnest(p.hashtags) AS hashtag) h
+        WHERE p.account_id IS NOT NULL
+        GROUP BY p.account_id, h.hashtag
+        ON CONFLICT (account_id, hashtag, month) DO NOTHING
+    $sql$, part) USING month;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION compact_instagram_insights(part REGCLASS, month DATE)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format($sql$
+        INSERT INTO instagram_insights_monthly (
+            account_id, month, days, followers_count, impressions, reach, profile_views,
+            website_clicks, email_contacts, phone_calls, get_directions_clicks
+        )
+        SELECT account_id, $1, COUNT(*),
+            (array_agg(followers_count ORDER BY date DESC) FILTER (WHERE followers_count IS NOT NULL))[1],
+            SUM(impressions), SUM(reach), SUM(profile_views), SUM(website_clicks),
+            SUM(email_contacts), SUM(phone_calls), SUM(get_directions_clicks)
+        FROM %s
+        WHERE account_id IS NOT NULL
+        GROUP BY account_id
+        ON CONFLICT (account_id, month) DO NOTHING
+    $sql$, part) USING month;
+
+    -- Every month's snapshots start with a keyframe, so keyframes replay on their own
+    EXECUTE format($sql$
+        INSERT INTO instagram_demographics_archive (account_id, date, audience_demographics)
+        SELECT account_id, date, audience_demographics
+        FROM %s
+        WHERE account_id IS NOT NULL
+        AND audience_demographics->>'type' = 'keyframe'
+        ON CONFLICT (account_id, date) DO NOTHING
+    $sql$, part);
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION compact_sentiment_analysis(part REGCLASS, month DATE)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format($sql$
+        INSERT INTO sentiment_analysis_daily (
+            source_platform, day, sentiment, mentions, sentiment_score_sum, confidence_sum
+        )
+        SELECT COALESCE(source_platform, 'unknown'), analyzed_at::date, COALESCE(sentiment, 'unknown'),
+            COUNT(*), SUM(sentiment_score), SUM(confidence)
+        FROM %s
+        GROUP BY 1, 2, 3
+        ON CONFLICT (source_platform, day, sentiment) DO NOTHING
+    $sql$, part);
+END;
+$$ language 'plpgsql';
+
+-- Daily job: create upcoming partitions, adopt stray months from the default
+-- partitions, and compact + drop months past retention. Returns what it did
+-- (or would do, with dry_run).
+--
+--   SELECT * FROM run_partition_maintenance();
+CREATE OR REPLACE FUNCTION run_partition_maintenance(dry_run BOOLEAN DEFAULT false)
+RETURNS TABLE (parent_table TEXT, partition_name TEXT, action TEXT) AS $$
+DECLARE
+    policy RECORD;
+    part RECORD;
+    month DATE;
+    cutoff DATE;
+BEGIN
+    FOR policy IN SELECT * FROM partition_policies p ORDER BY p.table_name LOOP
+        parent_table := policy.table_name;
+
+        -- Months the default partition caught, then the current and upcoming months
+        FOR month IN EXECUTE format(
+            'SELECT DISTINCT date_trunc(''month'', %I)::date FROM %I
+             UNION
+             SELECT generate_series(date_trunc(''month'', CURRENT_DATE),
+                                    date_trunc(''month'', CURRENT_DATE) + make_interval(months => $1),
+                                    INTERVAL ''1 month'')::date
+             ORDER BY 1',
+            policy.partition_column, policy.table_name || '_default'
+        ) USING policy.premake_months LOOP
+            partition_name := format('%s_p%s', policy.table_name, to_char(month, 'YYYY_MM'));
+            IF to_regclass(partition_name) IS NULL THEN
+                IF NOT dry_run THEN
+                    PERFORM create_monthly_partition(policy.table_name, month);
+                END IF;
+                action := 'created';
+                RETURN NEXT;
+            END IF;
+        END LOOP;
+
+        cutoff := (date_trunc('month', CURRENT_DATE) - make_interval(months => policy.retention_months))::date;
+        FOR part IN
+            SELECT c.relname, to_date(right(c.relname, 7), 'YYYY_MM') AS month
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = policy.table_name::regclass
+            AND c.relname ~ '_p[0-9]{4}_[0-9]{2}$'
+            AND to_date(right(c.relname, 7), 'YYYY_MM') < cutoff
+            ORDER BY 2
+        LOOP
+            IF NOT dry_run THEN
+                IF policy.compact_function IS NOT NULL THEN
+                    EXECUTE format('SELECT %I($1::regclass, $2)', policy.compact_function)
+                        USING part.relname, part.month;
+                END IF;
+                EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', policy.table_name, part.relname);
+                EXECUTE format('DROP TABLE %I', part.relname);
+            END IF;
+            partition_name := part.relname;
+            action := 'compacted';
+            RETURN NEXT;
+        END LOOP;
+    END LOOP;
+END;
+$$ language 'plpgsql';
+
+-- BEFORE INSERT guard on the partitioned tables: drops rows older than the
+-- retention window (e.g. a re-fetched two-year-old post), which would
+-- otherwise land in the default partition and be counted twice next to the
+-- compacted totals for their month. Takes the table name as its argument.
+CREATE OR REPLACE FUNCTION skip_rows_past_retention()
+RETURNS TRIGGER AS $$
+DECLARE
+    policy RECORD;
+BEGIN
+    SELECT p.partition_column, p.retention_months INTO policy
+    FROM partition_policies p WHERE p.table_name = TG_ARGV[0];
+    IF FOUND AND (to_jsonb(NEW)->>policy.partition_column)::timestamp
+        < date_trunc('month', CURRENT_DATE) - make_interval(months => policy.retention_months) THEN
+        RETURN NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- ============================================
+-- CONVERT TABLES (skipped once partitioned)
+-- ============================================
+
+-- The view reads instagram_insights, which is about to be replaced
+DROP VIEW IF EXISTS instagram_demographics_snapshots;
+
+DO $$
+DECLARE
+    part_month DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'instagram_posts'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE instagram_posts RENAME TO instagram_posts_unpartitioned;
+    ALTER INDEX instagram_posts_pkey RENAME TO instagram_posts_unpartitioned_pkey;
+    ALTER INDEX instagram_posts_post_id_key RENAME TO instagram_posts_unpartitioned_post_id_key;
+    DROP INDEX IF EXISTS idx_instagram_posts_timestamp;
+    DROP INDEX IF EXISTS idx_instagram_posts_engagement;
+
+    CREATE TABLE instagram_posts (
+        id UUID NOT NULL DEFAULT uuid_generate_v4(),
+        post_id VARCHAR(255) NOT NULL,
+        account_id UUID REFERENCES social_accounts(id),
+        caption TEXT,
+        media_type VARCHAR(50), -- IMAGE, VIDEO, CAROUSEL
+        media_url TEXT,
+        permalink TEXT,
+        timestamp TIMESTAMP NOT NULL,
+        like_count INTEGER DEFAULT 0,
+        comment_count INTEGER DEFAULT 0,
+        reach INTEGER DEFAULT 0,
+        impressions INTEGER DEFAULT 0,
+        engagement_rate DECIMAL(5,2),
+        saved_count INTEGER DEFAULT 0,
+        shares_count INTEGER DEFAULT 0,
+        hashtags TEXT[],
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (post_id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+    CREATE TABLE instagram_posts_default PARTITION OF instagram_posts DEFAULT;
+
+    FOR part_month IN
+        SELECT generate_series(
+            date_trunc('month', min(COALESCE(timestamp, created_at, CURRENT_TIMESTAMP))),
+            date_trunc('month', CURRENT_DATE), INTERVAL '1 month')::date
+        FROM instagram_posts_unpartitioned
+    LOOP
+        PERFORM create_monthly_partition('instagram_posts', part_month);
+    END LOOP;
+
+    INSERT INTO instagram_posts (
+        id, post_id, account_id, caption, media_type, media_url, permalink, timestamp,
+        like_count, comment_count, reach, impressions, engagement_rate, saved_count,
+        shares_count, hashtags, created_at, updated_at
+    )
+    SELECT
+        id, post_id, account_id, caption, media_type, media_url, permalink,
+        COALESCE(timestamp, created_at, CURRENT_TIMESTAMP),
+        like_count, comment_count, reach, impressions, engagement_rate, saved_count,
+        shares_count, hashtags, created_at, updated_at
+    FROM instagram_posts_unpartitioned;
+
+    DROP TABLE instagram_posts_unpartitioned;
+END $$;
+
+DO $$
+DECLARE
+    part_month DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'instagram_insights'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE instagram_insights RENAME TO instagram_insights_unpartitioned;
+    ALTER INDEX instagram_insights_pkey RENAME TO instagram_insights_unpartitioned_pkey;
+    ALTER INDEX instagram_insights_account_id_date_key RENAME TO instagram_insights_unpartitioned_account_id_date_key;
+    DROP INDEX IF EXISTS idx_instagram_insights_date;
+
+    CREATE TABLE instagram_insights (
+        id UUID NOT NULL DEFAULT uuid_generate_v4(),
+        account_id UUID REFERENCES social_accounts(id),
+        date DATE NOT NULL,
+        followers_count INTEGER,
+        impressions INTEGER,
+        reach INTEGER,
+        profile_views INTEGER,
+        website_clicks INTEGER,
+        email_contacts INTEGER,
+        phone_calls INTEGER,
+        get_directions_clicks INTEGER,
+        audience_demographics JSONB,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, date),
+        UNIQUE(account_id, date)
+    ) PARTITION BY RANGE (date);
+    CREATE TABLE instagram_insights_default PARTITION OF instagram_insights DEFAULT;
+
+    FOR part_month IN
+        SELECT generate_series(
+            date_trunc('month', min(date)), date_trunc('month', CURRENT_DATE), INTERVAL '1 month')::date
+        FROM instagram_insights_unpartitioned
+    LOOP
+        PERFORM create_monthly_partition('instagram_insights', part_month);
+    END LOOP;
+
+    INSERT INTO instagram_insights SELECT * FROM instagram_insights_unpartitioned;
+
+    DROP TABLE instagram_insights_unpartitioned;
+END $$;
+
+DO $$
+DECLARE
+    part_month DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'sentiment_analysis'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE sentiment_analysis RENAME TO sentiment_analysis_unpartitioned;
+    ALTER INDEX sentiment_analysis_pkey RENAME TO sentiment_analysis_unpartitioned_pkey;
+    DROP INDEX IF EXISTS idx_sentiment_platform;
+    DROP INDEX IF EXISTS idx_sentiment_score;
+
+    CREATE TABLE sentiment_analysis (
+        id UUID NOT NULL DEFAULT uuid_generate_v4(),
+        source_platform VARCHAR(50), -- instagram, facebook, tiktok
+        source_id VARCHAR(255), -- post_id, comment_id, etc
+        text_content TEXT,
+        sentiment VARCHAR(20), -- positive, negative, neutral
+        sentiment_score DECIMAL(5,4), -- -1 to 1
+        confidence DECIMAL(5,4),
+        emotions JSONB, -- {joy: 0.8, anger: 0.1, etc}
+        analyzed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, analyzed_at)
+    ) PARTITION BY RANGE (analyzed_at);
+    CREATE TABLE sentiment_analysis_default PARTITION OF sentiment_analysis DEFAULT;
+
+    FOR part_month IN
+        SELECT generate_series(
+            date_trunc('month', min(COALESCE(analyzed_at, CURRENT_TIMESTAMP))),
+            date_trunc('month', CURRENT_DATE), INTERVAL '1 month')::date
+        FROM sentiment_analysis_unpartitioned
+    LOOP
+        PERFORM create_monthly_partition('sentiment_analysis', part_month);
+    END LOOP;
+
+    INSERT INTO sentiment_analysis (
+        id, source_platform, source_id, text_content, sentiment, sentiment_score,
+        confidence, emotions, analyzed_at
+    )
+    SELECT
+        id, source_platform, source_id, text_content, sentiment, sentiment_score,
+        confidence, emotions, COALESCE(analyzed_at, CURRENT_TIMESTAMP)
+    FROM sentiment_analysis_unpartitioned;
+
+    DROP TABLE sentiment_analysis_unpartitioned;
+END $$;
+
+-- Every stored demographics snapshot, live or archived (get_demographics_trend)
+CREATE OR REPLACE VIEW instagram_demographics_snapshots AS
+    SELECT account_id, date, audience_demographics
+    FROM instagram_insights
+    WHERE audience_demographics IS NOT NULL
+    UNION ALL
+    SELECT account_id, date, audience_demographics
+    FROM instagram_demographics_archive;
+
+-- Indexes matching the tool queries: account + time window with the metrics
+-- they sort and average on, so the planner can answer from the index alone
+CREATE INDEX IF NOT EXISTS idx_instagram_posts_account_time ON instagram_posts(account_id, timestamp DESC)
+    INCLUDE (engagement_rate, reach, impressions, like_count, comment_count, saved_count);
+CREATE INDEX IF NOT EXISTS idx_instagram_posts_hashtags ON instagram_posts USING GIN (hashtags);
+CREATE INDEX IF NOT EXISTS idx_instagram_insights_keyframes ON instagram_insights(account_id, date)
+    WHERE audience_demographics->>'type' = 'keyframe';
+CREATE INDEX IF NOT EXISTS idx_sentiment_platform_time ON sentiment_analysis(source_platform, analyzed_at DESC)
+    INCLUDE (sentiment, sentiment_score, confidence);
+CREATE INDEX IF NOT EXISTS idx_sentiment_source ON sentiment_analysis(source_platform, source_id);
+
+-- Triggers are recreated on the partitioned table (row copies above ran without them)
+DROP TRIGGER IF EXISTS update_instagram_posts_updated_at ON instagram_posts;
+CREATE TRIGGER update_instagram_posts_updated_at BEFORE UPDATE ON instagram_posts
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS calculate_instagram_engagement ON instagram_posts;
+CREATE TRIGGER calculate_instagram_engagement BEFORE INSERT OR UPDATE ON instagram_posts
+    FOR EACH ROW EXECUTE FUNCTION calculate_engagement_rate();
+
+DROP TRIGGER IF EXISTS update_campaigns_from_instagram_posts ON instagram_posts;
+CREATE TRIGGER update_campaigns_from_instagram_posts AFTER INSERT OR UPDATE ON instagram_posts
+    FOR EACH ROW EXECUTE FUNCTION apply_post_metrics_to_campaigns('instagram');
+
+DROP TRIGGER IF EXISTS skip_instagram_posts_past_retention ON instagram_posts;
+CREATE TRIGGER skip_instagram_posts_past_retention BEFORE INSERT ON instagram_posts
+    FOR EACH ROW EXECUTE FUNCTION skip_rows_past_retention('instagram_posts');
+
+DROP TRIGGER IF EXISTS skip_instagram_insights_past_retention ON instagram_insights;
+CREATE TRIGGER skip_instagram_insights_past_retention BEFORE INSERT ON instagram_insights
+    FOR EACH ROW EXECUTE FUNCTION skip_rows_past_retention('instagram_insights');
+
+DROP TRIGGER IF EXISTS skip_sentiment_analysis_past_retention ON sentiment_analysis;
+CREATE TRIGGER skip_sentiment_analysis_past_retention BEFORE INSERT ON sentiment_analysis
+    FOR EACH ROW EXECUTE FUNCTION skip_rows_past_retention('sentiment_analysis');
+
+-- Create upcoming months and compact anything already past retention
+SELECT * FROM run_partition_maintenance();
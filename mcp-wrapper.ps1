@@ -8,6 +8,7 @@ param(
     [Parameter(Mandatory=$true)]
     [string]$ToolName,
 
+    # Tool arguments as a JSON object, e.g. '{"topic": "burger", "limit": 5}'
     [Parameter(ValueFromRemainingArguments=$true)]
     [string[]]$Arguments
 )
@@ -18,6 +19,9 @@ $ProjectPath = "C:\Users\godja\Desktop\hospitality_marketing_assistant_claude"
 $containerMap = @{
     "content-generator" = "mcp-content-generator"
     "instagram-analytics" = "mcp-instagram-analytics"
+    "facebook-insights" = "mcp-facebook-insights"
+    "campaign-tracker" = "mcp-campaign-tracker"
+    "media-processor" = "mcp-media-processor"
 }
 
 $containerName = $containerMap[$ServerName]
@@ -35,19 +39,32 @@ if ($running -ne $containerName) {
     exit 1
 }
 
+if ($ToolName -notmatch '^\w+$') {
+    Write-Error "Invalid tool name: $ToolName"
+    exit 1
+}
+
+# Arguments are read from stdin, not pasted into the Python source, so quotes in values cannot break it
+$argsJson = ($Arguments -join " ").Trim()
+if (-not $argsJson) {
+    $argsJson = "{}"
+}
+
 # Execute the tool via docker exec
-docker exec -i $containerName python -c @"
+$argsJson | docker exec -i $containerName python -c @"
 import sys
-sys.path.insert(0, '/app')
-from server import $ToolName
 import json
+sys.path.insert(0, '/app')
+import asyncio
+from fastmcp import Client
+from server import mcp
+
+params = json.loads(sys.stdin.read())
 
-# Parse arguments if provided
-args = '$Arguments'
-if args:
-    result = $ToolName($args)
-else:
-    result = $ToolName()
+async def main():
+    async with Client(mcp) as client:
+        result = await client.call_tool('$ToolName', params)
+        print(result.content[0].text)
 
-print(json.dumps(result, indent=2))
+asyncio.run(main())
 "@
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the MCP servers
+Calls one tool many times through an in-memory MCP client and reports throughput
+at each concurrency level.
+
+The old synchronous tools blocked the event loop, so their throughput stayed at
+their one-at-a-time rate whatever the concurrency; the README records measured
+before/after figures. Higher levels show how far the async tools scale within a
+single process.
+
+Run it inside a server container so it uses the real database, Redis and APIs:
+
+    docker exec -i mcp-instagram-analytics python - \
+        --tool get_optimal_posting_times --calls 200 --concurrency 1,8,32 < scripts/load-test.py
+
+Or from the repository with the services' environment variables exported:
+
+    python scripts/load-test.py --server instagram-analytics --tool get_account_insights \
+        --args '{"date_range": "last_7_days"}'
+
+--fake-graph-ms serves the Graph API from the benchmark stand-in (benchmarks/fakes.py)
+with that much latency per request, so Graph-bound tools can be measured without
+touching Meta.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import statistics
+
+
+def load_server(server_name: str):
+    """Import a server module - /app inside containers, services/ in the repo"""
+    if os.path.exists("/app/server.py"):
+        sys.path.insert(0, "/app")
+    else:
+        services_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services")
+        sys.path.insert(0, os.path.join(services_dir, f"mcp-{server_name}"))
+        sys.path.insert(0, services_dir)
+
+    import server
+    return server.mcp
+
+
+def start_fake_graph(latency_ms: float) -> str:
+    """Serve the benchmark Graph API stand-in on a free port; returns its base URL"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+    from fakes import BackgroundServer, Latency, create_graph_app
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    BackgroundServer(create_graph_app(Latency(latency_ms, 0), 200), port).start()
+    return f"http://127.0.0.1:{port}/v18.0"
+
+
+async def run_level(mcp, tool: str, args: dict, calls: int, concurrency: int) -> dict:
+    """Issue `calls` tool calls with at most `concurrency` in flight"""
+    from fastmcp import Client
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with Client(mcp) as client:
+        async def one_call():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                result = await client.call_tool(tool, args, raise_on_error=False)
+                latencies.append(time.perf_counter() - started)
+                if result.is_error or '"error"' in (result.content[0].text if result.content else ""):
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[one_call() for _ in range(calls)])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "calls_per_second": round(calls / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for an MCP server tool")
+    parser.add_argument("--server", default="instagram-analytics",
+                        help="Service name without the mcp- prefix (ignored inside containers)")
+    parser.add_argument("--tool", required=True, help="Tool to call")
+    parser.add_argument("--args", default="{}", help="Tool arguments as JSON")
+    parser.add_argument("--calls", type=int, default=100, help="Calls per concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--fake-graph-ms", type=float,
+                        help="Serve the Graph API from the local stand-in with this latency (ms)")
+    options = parser.parse_args()
+
+    # Before the import: the servers read GRAPH_API_URL when they load
+    if options.fake_graph_ms is not None:
+        os.environ["GRAPH_API_URL"] = start_fake_graph(options.fake_graph_ms)
+        os.environ.setdefault("META_ACCESS_TOKEN", "load-test")
+
+    mcp = load_server(options.server)
+    args = json.loads(options.args)
+
+    results = []
+    for level in [int(c) for c in options.concurrency.split(",")]:
+        result = await run_level(mcp, options.tool, args, options.calls, level)
+        results.append(result)
+        print(f"concurrency={result['concurrency']:>3}  {result['calls_per_second']:>8} calls/s  "
+              f"p50={result['p50_ms']}ms  p99={result['p99_ms']}ms  errors={result['errors']}")
+
+    baseline = results[0]["calls_per_second"]
+    if baseline:
+        best = max(results, key=lambda r: r["calls_per_second"])
+        print(f"\nSpeedup over one call at a time: "
+              f"{best['calls_per_second'] / baseline:.1f}x at concurrency {best['concurrency']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Daily Instagram audience demographics snapshot
+Fetches the audience breakdown and stores it as a compact snapshot for
+get_demographics_trend. Graph calls run at background priority, so they never
+take the quota reserved for interactive tool calls.
+
+Schedule it once a day, e.g. from the host's crontab:
+
+    15 3 * * * docker exec -i mcp-instagram-analytics python - < /path/to/scripts/snapshot-demographics.py
+
+get_audience_demographics also records a snapshot whenever it fetches fresh data,
+so running both on the same day only rewrites that day's snapshot.
+"""
+
+import os
+import sys
+import asyncio
+
+
+def load_server():
+    """Import the Instagram server module - /app inside the container, services/ in the repo"""
+    if os.path.exists("/app/server.py"):
+        sys.path.insert(0, "/app")
+    else:
+        services_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services")
+        sys.path.insert(0, os.path.join(services_dir, "mcp-instagram-analytics"))
+        sys.path.insert(0, services_dir)
+
+    import server
+    return server
+
+
+async def main():
+    server = load_server()
+
+    from shared.quota import background_priority
+    from shared.serve import close_resources
+
+    try:
+        with background_priority():
+            demographics = await server.fetch_audience_demographics()
+        kind = await server.record_demographics_snapshot(demographics)
+        print(f"Stored demographics {kind} for account {server.INSTAGRAM_BUSINESS_ACCOUNT_ID}")
+    finally:
+        await close_resources()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -15,10 +15,18 @@ def run_mcp_tool(tool_name, **kwargs):
 
     python_code = f'''
 import sys
+import json
+import asyncio
 sys.path.insert(0, "/app")
+from fastmcp import Client
 from server import mcp
-import json
-mcp.run(default_tool=tool_name, default_params=json.loads('{args_str}'))
+
+async def main():
+    async with Client(mcp) as client:
+        result = await client.call_tool("{tool_name}", json.loads('{args_str}'))
+        print(result.content[0].text)
+
+asyncio.run(main())
 '''
 
     result = subprocess.run(
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for media processor watermarks
+Checks the ffmpeg escaping of watermark text (business names with ' : and \\),
+that video logos come out the same size as image logos, and that assets are
+only recorded as watermarked when something was stamped. The ffmpeg checks
+need ffmpeg on PATH and are skipped without it; run them in the container:
+
+    docker exec -i mcp-media-processor python - < scripts/test-media-watermark.py
+"""
+
+import os
+import re
+import sys
+import shutil
+import tempfile
+import subprocess
+
+
+def load_pipeline():
+    """Import the media pipeline module - /app inside the container, services/ in the repo"""
+    if os.path.exists("/app/pipeline.py"):
+        sys.path.insert(0, "/app")
+    else:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services", "mcp-media-processor"))
+
+    import pipeline
+    return pipeline
+
+
+pipeline = load_pipeline()
+from PIL import Image, ImageOps
+
+NAMES = ["Dracula's Delight", "Mitch's: Bar \\ Grill", "50% off, [today]; 'really'", "C:\\menu\\%{pts}"]
+
+
+def print_section(title):
+    """Print a formatted section header"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60 + "\n")
+
+
+def ffmpeg(*args):
+    subprocess.run(["ffmpeg", "-v", "error", "-y", *args], capture_output=True, check=True)
+
+
+def has_filter(name):
+    output = subprocess.run(["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True).stdout
+    return re.search(rf"^\s*\S+\s+{name}\s", output, re.MULTILINE) is not None
+
+
+def test_escaping():
+    """Option-level quoting, then filter-graph escaping"""
+    assert pipeline._filter_value("Dracula's: C:\\Fonts") == r"\'Dracula\'\\\'\'s: C:\\Fonts\'"
+    assert pipeline._filter_value("a,b;[c]") == r"\'a\,b\;\[c\]\'"
+
+
+def test_watermarked_flag(work_dir):
+    """An asset is only recorded as watermarked when a logo or text was stamped"""
+    source = os.path.join(work_dir, "photo.jpg")
+    Image.new("RGB", (1600, 1200), (40, 80, 120)).save(source)
+    logo = os.path.join(work_dir, "logo.png")
+    Image.new("RGBA", (400, 200), (255, 0, 0, 128)).save(logo)
+    asset = {"id": "test", "file_path": source, "media_type": "image"}
+
+    cases = [
+        ({"image_path": os.path.join(work_dir, "missing.png"), "text": ""}, False),
+        ({"image_path": os.path.join(work_dir, "missing.png"), "text": "Dracula's Delight"}, True),
+        ({"image_path": logo, "text": ""}, True),
+        ({"text": ""}, False),
+    ]
+    for watermark, expected in cases:
+        result = pipeline.process_asset(asset, work_dir, os.path.join(work_dir, "out"), watermark)
+        assert "error" not in result, result.get("error")
+        assert result["watermarked"] is expected, f"{watermark}: watermarked={result['watermarked']}"
+
+
+def test_text_round_trip(work_dir):
+    """Each name reaches the filter exactly as written (metadata echoes the parsed value)"""
+    meta = os.path.join(work_dir, "meta.txt")
+    for name in NAMES:
+        ffmpeg(
+            "-f", "lavfi", "-i", "testsrc=size=64x64:rate=1:duration=1",
+            "-filter_complex",
+            f"[0:v]metadata=mode=add:key=wm:value={pipeline._filter_value(name)},"
+            f"metadata=mode=print:file={meta}[out]",
+            "-map", "[out]", "-f", "null", "-",
+        )
+        with open(meta) as f:
+            parsed = re.search(r"wm=(.*)", f.read()).group(1)
+        assert parsed == name, f"{name!r} reached ffmpeg as {parsed!r}"
+
+
+def test_drawtext(work_dir, source):
+    """The text watermark filter graph runs for names with ' : and \\"""
+    spec = pipeline.PLATFORM_VARIANTS["instagram_feed"]
+    for name in NAMES:
+        extra_inputs, filter_graph = pipeline._video_filter(spec, {"text": name})
+        ffmpeg("-i", source, *extra_inputs, "-filter_complex", filter_graph, "-map", "[out]", "-f", "null", "-")
+
+
+def test_logo_size(work_dir, source):
+    """Video logos fit a fifth of the frame, like the image thumbnail"""
+    logo = os.path.join(work_dir, "logo.png")
+    logo_out = os.path.join(work_dir, "logo_out.png")
+    for logo_size in [(2000, 1000), (100, 300), (40, 20)]:
+        Image.new("RGBA", logo_size, (255, 0, 0, 128)).save(logo)
+        for platform, spec in pipeline.PLATFORM_VARIANTS.items():
+            extra_inputs, filter_graph = pipeline._video_filter(spec, {"image_path": logo})
+            ffmpeg("-i", source, *extra_inputs, "-filter_complex", filter_graph, "-map", "[out]", "-f", "null", "-")
+
+            # Same graph, keeping the scaled logo instead of the overlay
+            logo_only = filter_graph.replace("[frame][logo]overlay=W-w-20:H-h-20[out]", "[frame]nullsink;[logo]null[out]")
+            ffmpeg("-i", source, *extra_inputs, "-filter_complex", logo_only, "-map", "[out]", "-frames:v", "1", logo_out)
+
+            frame = ImageOps.contain(Image.new("RGB", (1920, 1080)), spec["size"])
+            with Image.open(logo) as thumbnail:
+                thumbnail.thumbnail((frame.width // 5, frame.height // 5))
+                expected = thumbnail.size
+            with Image.open(logo_out) as stamped:
+                assert stamped.size == expected, f"{logo_size} on {platform}: {stamped.size}, image path {expected}"
+
+
+def main():
+    print_section("🖼️ Media Watermark Test Suite")
+    work_dir = tempfile.mkdtemp()
+    try:
+        print_section("Test 1: Filter Escaping")
+        test_escaping()
+        print("✅ Escaped strings match")
+
+        print_section("Test 2: Watermarked Flag")
+        test_watermarked_flag(work_dir)
+        print("✅ Missing logos without text are not recorded as watermarked")
+
+        if not shutil.which("ffmpeg"):
+            print("\n⚠️  ffmpeg not found - skipping the ffmpeg checks")
+        else:
+            source = os.path.join(work_dir, "source.mp4")
+            ffmpeg("-f", "lavfi", "-i", "testsrc=size=1920x1080:rate=5:duration=1", source)
+
+            print_section("Test 3: Text Through ffmpeg")
+            test_text_round_trip(work_dir)
+            if has_filter("drawtext"):
+                test_drawtext(work_dir, source)
+                print("✅ Business names reach drawtext unchanged")
+            else:
+                print("✅ Business names reach ffmpeg unchanged (no drawtext in this build, filter not run)")
+
+            print_section("Test 4: Logo Size")
+            test_logo_size(work_dir, source)
+            print("✅ Video logos match the image watermark size")
+
+        print_section("✨ Test Summary")
+        print("✅ All tests passed!")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        print(f"\n❌ ffmpeg failed: {e.stderr.decode(errors='replace').strip()[-500:]}")
+        sys.exit(1)
@@ -0,0 +1,307 @@
+"""
+MCP Server for Campaign Tracking
+Groups Instagram and Facebook posts into campaigns and reports their combined performance
+
+Campaign totals are maintained incrementally by database triggers on instagram_posts
+and facebook_posts (see database/migrations/001_campaign_aggregates.sql), so reports
+read a single pre-aggregated row instead of re-summing every post.
+"""
+
+from datetime import date
+from typing import Optional, List, Dict, Any
+from fastmcp import FastMCP
+
+from shared.db import get_db_connection
+from shared.metrics import instrument_tool
+from shared.serve import run_server
+
+# Initialize MCP server
+mcp = FastMCP("Campaign Tracker")
+
+# Resolves post ids against both platforms and folds their current metrics into the
+# campaign totals. Ids that have not been synced yet are registered with zero metrics;
+# the post table triggers add their numbers once the analytics servers store them.
+ADD_POSTS_SQL = """
+    WITH requested AS (
+        SELECT DISTINCT unnest($2::text[]) AS post_id
+    ),
+    resolved AS (
+        SELECT
+            'instagram' AS platform,
+            p.post_id,
+            COALESCE(p.impressions, 0) AS impressions,
+            COALESCE(p.reach, 0) AS reach,
+            COALESCE(p.like_count, 0) + COALESCE(p.comment_count, 0)
+                + COALESCE(p.saved_count, 0) + COALESCE(p.shares_count, 0) AS engagement
+        FROM instagram_posts p
+        JOIN requested r USING (post_id)
+        UNION ALL
+        SELECT
+            'facebook',
+            p.post_id,
+            COALESCE(p.impressions, 0),
+            COALESCE(p.reach, 0),
+            COALESCE(p.reactions_count, 0) + COALESCE(p.comments_count, 0) + COALESCE(p.shares_count, 0)
+        FROM facebook_posts p
+        JOIN requested r USING (post_id)
+        UNION ALL
+        -- Not synced yet: Facebook post ids look like "<page_id>_<post_id>", Instagram ids are numeric
+        SELECT
+            CASE WHEN position('_' IN r.post_id) > 0 THEN 'facebook' ELSE 'instagram' END,
+            r.post_id,
+            0, 0, 0
+        FROM requested r
+        WHERE NOT EXISTS (SELECT 1 FROM instagram_posts WHERE post_id = r.post_id)
+        AND NOT EXISTS (SELECT 1 FROM facebook_posts WHERE post_id = r.post_id)
+    ),
+    added AS (
+        INSERT INTO campaign_posts (campaign_id, platform, post_id, impressions, reach, engagement)
+        SELECT $1::uuid, platform, post_id, impressions, reach, engagement
+        FROM resolved
+        ON CONFLICT DO NOTHING
+        RETURNING platform, post_id, impressions, reach, engagement
+    ),
+    delta AS (
+        SELECT
+            COUNT(*) AS added_count,
+            COALESCE(SUM(impressions), 0) AS impressions,
+            COALESCE(SUM(reach), 0) AS reach,
+            COALESCE(SUM(engagement), 0) AS engagement,
+            COALESCE(array_agg(DISTINCT platform), '{}') AS platforms,
+            COALESCE(array_agg(post_id), '{}') AS post_ids
+        FROM added
+    )
+    UPDATE campaign_performance c SET
+        total_impressions = COALESCE(c.total_impressions, 0) + d.impressions,
+        total_reach = COALESCE(c.total_reach, 0) + d.reach,
+        total_engagement = COALESCE(c.total_engagement, 0) + d.engagement,
+        engagement_rate = campaign_engagement_rate(
+            COALESCE(c.total_engagement, 0) + d.engagement,
+            COALESCE(c.total_impressions, 0) + d.impressions
+        ),
+        platforms = ARRAY(SELECT DISTINCT unnest(COALESCE(c.platforms, '{}') || d.platforms::text[])),
+        post_ids = COALESCE(c.post_ids, '{}') || d.post_ids::text[],
+        updated_at = CURRENT_TIMESTAMP
+    FROM delta d
+    WHERE c.id = $1::uuid
+    RETURNING d.added_count
+"""
+
+REPORT_SQL = """
+    SELECT
+        id::text AS campaign_id,
+        campaign_name,
+        platforms,
+        COALESCE(cardinality(post_ids), 0) AS post_count,
+        start_date,
+        end_date,
+        COALESCE(total_impressions, 0) AS total_impressions,
+        COALESCE(total_reach, 0) AS total_reach,
+        COALESCE(total_engagement, 0) AS total_engagement,
+        COALESCE(total_clicks, 0) AS total_clicks,
+        COALESCE(engagement_rate, 0) AS engagement_rate,
+        roi_score,
+        updated_at
+    FROM campaign_performance
+    WHERE id = $1::uuid
+"""
+
+
+def format_report(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a campaign_performance row into a JSON-friendly report"""
+    return {
+        "campaign_id": row["campaign_id"],
+        "campaign_name": row["campaign_name"],
+        "platforms": row["platforms"] or [],
+        "post_count": int(row["post_count"]),
+        "start_date": str(row["start_date"]) if row["start_date"] else None,
+        "end_date": str(row["end_date"]) if row["end_date"] else None,
+        "totals": {
+            "impressions": int(row["total_impressions"]),
+            "reach": int(row["total_reach"]),
+            "engagement": int(row["total_engagement"]),
+            "clicks": int(row["total_clicks"]),
+        },
+        "engagement_rate": float(row["engagement_rate"]),
+        "roi_score": float(row["roi_score"]) if row["roi_score"] is not None else None,
+        "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None
+    }
+
+
+@mcp.tool()
+@instrument_tool
+async def create_campaign(
+    campaign_name: str,
+    post_ids: List[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create a campaign from Instagram and/or Facebook posts.
+
+    Args:
+        campaign_name: Name of the campaign (e.g., "Halloween Week 2025")
+        post_ids: Platform post ids to include - Instagram media ids and/or Facebook post ids
+        start_date: Campaign start date (YYYY-MM-DD, optional)
+        end_date: Campaign end date (YYYY-MM-DD, optional)
+
+    Returns:
+        The new campaign's id and its initial performance report
+    """
+    try:
+        start = date.fromisoformat(start_date) if start_date else None
+        end = date.fromisoformat(end_date) if end_date else None
+
+        async with get_db_connection() as conn:
+            campaign_id = await conn.fetchval("""
+                INSERT INTO campaign_performance (
+                    campaign_name, platforms, post_ids, start_date, end_date,
+                    total_impressions, total_reach, total_engagement, total_clicks,
+                    engagement_rate
+                ) VALUES ($1, '{}', '{}', $2, $3, 0, 0, 0, 0, 0)
+                RETURNING id::text
+            """, campaign_name, start, end)
+
+            await conn.execute(ADD_POSTS_SQL, campaign_id, post_ids)
+
+            report = format_report(await conn.fetchrow(REPORT_SQL, campaign_id))
+
+        return report
+
+    except ValueError:
+        return {"error": "Invalid date. Use YYYY-MM-DD."}
+    except Exception as e:
+        return {"error": f"Failed to create campaign: {str(e)}"}
+
+
+@mcp.tool()
+@instrument_tool
+async def add_posts_to_campaign(campaign_id: str, post_ids: List[str]) -> Dict[str, Any]:
+    """
+    Add posts to an existing campaign.
+
+    Args:
+        campaign_id: Campaign id returned by create_campaign
+        post_ids: Platform post ids to add (posts already in the campaign are ignored)
+
+    Returns:
+        Number of posts added and the updated performance report
+    """
+    try:
+        async with get_db_connection() as conn:
+            added_count = await conn.fetchval(ADD_POSTS_SQL, campaign_id, post_ids)
+            if added_count is None:
+                return {"error": f"Campaign not found: {campaign_id}"}
+
+            report = format_report(await conn.fetchrow(REPORT_SQL, campaign_id))
+
+        return {
+            "posts_added": int(added_count),
+            "report": report
+        }
+
+    except Exception as e:
+        return {"error": f"Failed to add posts: {str(e)}"}
+
+
+@mcp.tool()
+@instrument_tool
+async def get_campaign_report(campaign_id: str) -> Dict[str, Any]:
+    """
+    Get cross-platform performance for a campaign.
+
+    Totals are kept up to date as post metrics sync, so this is a single-row lookup
+    regardless of how many posts the campaign contains.
+
+    Args:
+        campaign_id: Campaign id returned by create_campaign
+
+    Returns:
+        Campaign totals (impressions, reach, engagement) and engagement rate
+    """
+    try:
+        async with get_db_connection() as conn:
+            row = await conn.fetchrow(REPORT_SQL, campaign_id)
+
+        if not row:
+            return {"error": f"Campaign not found: {campaign_id}"}
+
+        return format_report(row)
+
+    except Exception as e:
+        return {"error": f"Failed to get campaign report: {str(e)}"}
+
+
+@mcp.tool()
+@instrument_tool
+async def rebuild_campaign_totals(campaign_id: str) -> Dict[str, Any]:
+    """
+    Recompute a campaign's totals from scratch from the post tables.
+
+    Only needed to repair totals (e.g. after editing post rows by hand with
+    triggers disabled); normal syncs keep them current incrementally.
+
+    Args:
+        campaign_id: Campaign id returned by create_campaign
+
+    Returns:
+        The recomputed performance report
+    """
+    try:
+        async with get_db_connection() as conn:
+            # Refresh each post's contribution from the source tables
+            await conn.execute("""
+                UPDATE campaign_posts cp SET
+                    impressions = COALESCE(p.impressions, 0),
+                    reach = COALESCE(p.reach, 0),
+                    engagement = COALESCE(p.like_count, 0) + COALESCE(p.comment_count, 0)
+                        + COALESCE(p.saved_count, 0) + COALESCE(p.shares_count, 0)
+                FROM instagram_posts p
+                WHERE cp.campaign_id = $1::uuid
+                AND cp.platform = 'instagram'
+                AND p.post_id = cp.post_id
+            """, campaign_id)
+            await conn.execute("""
+                UPDATE campaign_posts cp SET
+                    impressions = COALESCE(p.impressions, 0),
+                    reach = COALESCE(p.reach, 0),
+                    engagement = COALESCE(p.reactions_count, 0) + COALESCE(p.comments_count, 0)
+                        + COALESCE(p.shares_count, 0)
+                FROM facebook_posts p
+                WHERE cp.campaign_id = $1::uuid
+                AND cp.platform = 'facebook'
+                AND p.post_id = cp.post_id
+            """, campaign_id)
+
+            await conn.execute("""
+                UPDATE campaign_performance c SET
+                    total_impressions = t.impressions,
+                    total_reach = t.reach,
+                    total_engagement = t.engagement,
+                    engagement_rate = campaign_engagement_rate(t.engagement, t.impressions),
+                    updated_at = CURRENT_TIMESTAMP
+                FROM (
+                    SELECT
+                        COALESCE(SUM(impressions), 0) AS impressions,
+                        COALESCE(SUM(reach), 0) AS reach,
+                        COALESCE(SUM(engagement), 0) AS engagement
+                    FROM campaign_posts
+                    WHERE campaign_id = $1::uuid
+                ) t
+                WHERE c.id = $1::uuid
+            """, campaign_id)
+
+            row = await conn.fetchrow(REPORT_SQL, campaign_id)
+
+        if not row:
+            return {"error": f"Campaign not found: {campaign_id}"}
+
+        return format_report(row)
+
+    except Exception as e:
+        return {"error": f"Failed to rebuild campaign totals: {str(e)}"}
+
+
+if __name__ == "__main__":
+    # Run the MCP server (stdio by default, --transport http for network mode)
+    run_server(mcp)
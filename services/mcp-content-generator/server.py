@@ -4,33 +4,25 @@ Uses Claude AI to generate social media captions, hashtags, and posts with brand
 """
 
 import os
-import json
 import yaml
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from anthropic import Anthropic
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import redis
+from typing import Dict, Any
+from anthropic import AsyncAnthropic
 from fastmcp import FastMCP
 
+from shared.db import get_db_connection
+from shared.metrics import instrument_tool, downstream_span, record_token_usage
+from shared.serve import run_server
+
 # Initialize MCP server
 mcp = FastMCP("Content Generator")
 
 # Environment variables
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-DATABASE_URL = os.getenv("DATABASE_URL")
-REDIS_URL = os.getenv("REDIS_URL")
 BRAND_VOICE_PROFILE = os.getenv("BRAND_VOICE_PROFILE", "professional")
 
 # Initialize clients
-anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY)
-redis_client = redis.from_url(REDIS_URL) if REDIS_URL else None
-
-
-def get_db_connection():
-    """Create database connection"""
-    return psycopg2.connect(DATABASE_URL)
+anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
 
 
 def load_brand_voice(profile: str = None) -> Dict[str, Any]:
@@ -62,7 +54,8 @@ def load_brand_voice(profile: str = None) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def generate_caption(
+@instrument_tool
+async def generate_caption(
     topic: str,
     platform: str = "instagram",
     include_hashtags: bool = True,
@@ -109,13 +102,15 @@ Requirements:
 Return ONLY the caption text, nothing else."""
 
         # Generate with Claude
-        message = anthropic_client.messages.create(
-            model="claude-3.5-sonnet",
-            max_tokens=1024,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        async with downstream_span("anthropic", "messages.create"):
+            message = await anthropic_client.messages.create(
+                model="claude-3.5-sonnet",
+                max_tokens=1024,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
+        record_token_usage("claude-3.5-sonnet", message.usage)
 
         caption_text = message.content[0].text.strip()
 
@@ -123,24 +118,21 @@ Return ONLY the caption text, nothing else."""
         hashtags = [word for word in caption_text.split() if word.startswith("#")]
 
         # Store in database
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO generated_content (
-                        content_type, platform, generated_text, hashtags,
-                        brand_voice, ai_model
-                    ) VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                """, (
-                    "caption",
-                    platform,
-                    caption_text,
-                    hashtags,
-                    brand_voice['name'],
-                    "claude-3.5-sonnet"
-                ))
-                content_id = cur.fetchone()[0]
-                conn.commit()
+        async with get_db_connection() as conn:
+            content_id = await conn.fetchval("""
+                INSERT INTO generated_content (
+                    content_type, platform, generated_text, hashtags,
+                    brand_voice, ai_model
+                ) VALUES ($1, $2, $3, $4, $5, $6)
+                RETURNING id
+            """,
+                "caption",
+                platform,
+                caption_text,
+                hashtags,
+                brand_voice['name'],
+                "claude-3.5-sonnet"
+            )
 
         return {
             "content_id": str(content_id),
@@ -156,5 +148,5 @@ Return ONLY the caption text, nothing else."""
         return {"error": f"Failed to generate caption: {str(e)}"}
 
 if __name__ == "__main__":
-    # Run the MCP server
-    mcp.run()
+    # Run the MCP server (stdio by default, --transport http for network mode)
+    run_server(mcp)
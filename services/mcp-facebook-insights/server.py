@@ -0,0 +1,319 @@
+"""
+MCP Server for Facebook Page Insights
+Exposes tools for retrieving Facebook Page insights and post performance data
+"""
+
+import os
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Any
+from fastmcp import FastMCP
+
+from shared.cache import cache_get, cache_set
+from shared.db import get_db_connection, bulk_upsert, ensure_social_account
+from shared.graph import make_graph_api_request, paginate, parse_graph_timestamp, resolve_date_range
+from shared.metrics import instrument_tool
+from shared.serve import run_server
+
+# Initialize MCP server
+mcp = FastMCP("Facebook Insights")
+
+# Environment variables
+FACEBOOK_PAGE_ID = os.getenv("FACEBOOK_PAGE_ID")
+# Page insights require a Page access token; fall back to the shared Meta token
+FACEBOOK_PAGE_ACCESS_TOKEN = os.getenv("FACEBOOK_PAGE_ACCESS_TOKEN") or os.getenv("META_ACCESS_TOKEN")
+
+# Number of recent posts pulled from the Graph API for ranking
+POST_FETCH_LIMIT = 50
+
+# engagement_rate is DECIMAL(5,2); capped like campaign_engagement_rate so a post
+# with few impressions cannot overflow it and abort the whole upsert
+MAX_ENGAGEMENT_RATE = 999.99
+
+# Graph API page metric -> facebook_page_insights column
+PAGE_METRICS = {
+    "page_views_total": "page_views",
+    "page_fans": "page_likes",
+    "page_engaged_users": "page_engaged_users",
+    "page_impressions": "page_impressions",
+    "page_impressions_unique": "page_reach",
+    "page_post_engagements": "post_engagements",
+}
+
+
+@mcp.tool()
+@instrument_tool
+async def get_page_insights(date_range: str = "last_7_days") -> Dict[str, Any]:
+    """
+    Get Facebook Page insights for a specified date range.
+
+    Args:
+        date_range: One of 'today', 'yesterday', 'last_7_days', 'last_30_days'
+
+    Returns:
+        Dictionary containing page metrics (views, likes, impressions, reach, engagement)
+    """
+    dates = resolve_date_range(date_range)
+    if not dates:
+        return {"error": "Invalid date_range. Use: today, yesterday, last_7_days, last_30_days"}
+    start_date, end_date = dates
+
+    # Check cache
+    cache_key = f"facebook_insights:{FACEBOOK_PAGE_ID}:{date_range}"
+    cached = await cache_get(cache_key)
+    if cached:
+        return json.loads(cached)
+
+    try:
+        params = {
+            "metric": ",".join(PAGE_METRICS),
+            "period": "day",
+            "since": str(start_date),
+            "until": str(end_date + timedelta(days=1))
+        }
+
+        data = await make_graph_api_request(
+            f"{FACEBOOK_PAGE_ID}/insights",
+            params,
+            FACEBOOK_PAGE_ACCESS_TOKEN
+        )
+
+        result = {
+            "page_id": FACEBOOK_PAGE_ID,
+            "date_range": date_range,
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "metrics": {}
+        }
+
+        # Page insights come back per day, so keep the daily breakdown for storage
+        daily: Dict[date, Dict[str, int]] = {}
+        for metric_data in data.get("data", []):
+            metric_name = metric_data["name"]
+            values = metric_data.get("values", [])
+
+            for value in values:
+                # end_time marks the end of the day the value belongs to
+                if value.get("end_time"):
+                    day = (parse_graph_timestamp(value["end_time"]) - timedelta(days=1)).date()
+                    daily.setdefault(day, {})[metric_name] = value.get("value", 0)
+
+            if metric_name == "page_fans":
+                # Lifetime total - report the latest value, not a sum
+                result["metrics"][metric_name] = values[-1].get("value", 0) if values else 0
+            else:
+                result["metrics"][metric_name] = sum(v.get("value", 0) for v in values)
+
+        # Cache for 1 hour
+        await cache_set(cache_key, json.dumps(result), 3600)
+
+        # Store in database
+        async with get_db_connection() as conn:
+            account_uuid = await ensure_social_account(conn, "facebook", FACEBOOK_PAGE_ID)
+
+            await bulk_upsert(conn, """
+                INSERT INTO facebook_page_insights (
+                    account_id,
+                    date,
+                    page_views,
+                    page_likes,
+                    page_engaged_users,
+                    page_impressions,
+                    page_reach,
+                    post_engagements
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                ON CONFLICT (account_id, date) DO UPDATE SET
+                    page_views = EXCLUDED.page_views,
+                    page_likes = EXCLUDED.page_likes,
+                    page_engaged_users = EXCLUDED.page_engaged_users,
+                    page_impressions = EXCLUDED.page_impressions,
+                    page_reach = EXCLUDED.page_reach,
+                    post_engagements = EXCLUDED.post_engagements
+            """, [
+                (account_uuid, day, *[values.get(metric, 0) for metric in PAGE_METRICS])
+                for day, values in sorted(daily.items())
+            ])
+
+        return result
+
+    except Exception as e:
+        return {"error": f"Failed to fetch page insights: {str(e)}"}
+
+
+@mcp.tool()
+@instrument_tool
+async def analyze_post_performance(limit: int = 10, sort_by: str = "engagement_rate") -> Dict[str, Any]:
+    """
+    Analyze top-performing Facebook Page posts.
+
+    Args:
+        limit: Number of posts to return (default: 10)
+        sort_by: Sort metric - 'engagement_rate', 'reach', 'impressions', 'reactions_count'
+
+    Returns:
+        List of top-performing posts with metrics
+    """
+    try:
+        # Fetch recent posts from Graph API (more than `limit` to have data to sort)
+        params = {
+            "fields": (
+                "id,message,created_time,permalink_url,status_type,shares,"
+                "reactions.summary(total_count).limit(0),"
+                "comments.summary(total_count).limit(0),"
+                "insights.metric(post_impressions,post_impressions_unique)"
+            )
+        }
+
+        items = await paginate(
+            f"{FACEBOOK_PAGE_ID}/posts",
+            params,
+            max(limit, POST_FETCH_LIMIT),
+            FACEBOOK_PAGE_ACCESS_TOKEN
+        )
+
+        posts = []
+
+        for item in items:
+            # Extract insights
+            insights = {}
+            for insight in item.get("insights", {}).get("data", []):
+                insights[insight["name"]] = insight["values"][0]["value"]
+
+            reactions = item.get("reactions", {}).get("summary", {}).get("total_count", 0)
+            comments = item.get("comments", {}).get("summary", {}).get("total_count", 0)
+            shares = item.get("shares", {}).get("count", 0)
+
+            # Calculate engagement rate
+            impressions = insights.get("post_impressions", 0)
+            engagement = reactions + comments + shares
+            engagement_rate = min(engagement / impressions * 100, MAX_ENGAGEMENT_RATE) if impressions > 0 else 0
+
+            posts.append({
+                "post_id": item["id"],
+                "message": item.get("message", ""),
+                "post_type": item.get("status_type"),
+                "created_time": item.get("created_time"),
+                "permalink_url": item.get("permalink_url"),
+                "reactions_count": reactions,
+                "comments_count": comments,
+                "shares_count": shares,
+                "impressions": impressions,
+                "reach": insights.get("post_impressions_unique", 0),
+                "engagement_rate": round(engagement_rate, 2)
+            })
+
+        # Store in database - all posts in a single round trip
+        async with get_db_connection() as conn:
+            account_uuid = await ensure_social_account(conn, "facebook", FACEBOOK_PAGE_ID)
+
+            await bulk_upsert(conn, """
+                INSERT INTO facebook_posts (
+                    post_id, account_id, message, post_type, created_time,
+                    reactions_count, comments_count, shares_count,
+                    reach, impressions, engagement_rate, permalink_url
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                ON CONFLICT (post_id) DO UPDATE SET
+                    reactions_count = EXCLUDED.reactions_count,
+                    comments_count = EXCLUDED.comments_count,
+                    shares_count = EXCLUDED.shares_count,
+                    reach = EXCLUDED.reach,
+                    impressions = EXCLUDED.impressions,
+                    engagement_rate = EXCLUDED.engagement_rate
+            """, [
+                (
+                    post_data["post_id"],
+                    account_uuid,
+                    post_data["message"],
+                    post_data["post_type"],
+                    parse_graph_timestamp(post_data["created_time"]),
+                    post_data["reactions_count"],
+                    post_data["comments_count"],
+                    post_data["shares_count"],
+                    post_data["reach"],
+                    post_data["impressions"],
+                    Decimal(str(post_data["engagement_rate"])),
+                    post_data["permalink_url"]
+                )
+                for post_data in posts
+            ])
+
+        # Sort posts
+        valid_sort_keys = ["engagement_rate", "reach", "impressions", "reactions_count"]
+        if sort_by not in valid_sort_keys:
+            sort_by = "engagement_rate"
+
+        posts.sort(key=lambda x: x.get(sort_by, 0), reverse=True)
+
+        return {
+            "total_posts": len(posts),
+            "top_posts": posts[:limit],
+            "sorted_by": sort_by
+        }
+
+    except Exception as e:
+        return {"error": f"Failed to analyze posts: {str(e)}"}
+
+
+@mcp.tool()
+@instrument_tool
+async def get_optimal_posting_times() -> Dict[str, Any]:
+    """
+    Analyze historical Page posts to determine optimal posting times.
+
+    Returns:
+        Recommended posting times based on when your audience is most active
+    """
+    try:
+        async with get_db_connection() as conn:
+            # Get posts with their engagement metrics
+            optimal_times = await conn.fetch("""
+                SELECT
+                    EXTRACT(ISODOW FROM created_time) as day_of_week,
+                    EXTRACT(HOUR FROM created_time) as hour_of_day,
+                    AVG(engagement_rate) as avg_engagement,
+                    AVG(reach) as avg_reach,
+                    COUNT(*) as post_count
+                FROM facebook_posts
+                WHERE account_id = (
+                    SELECT id FROM social_accounts
+                    WHERE platform='facebook' AND account_id=$1
+                )
+                AND created_time > NOW() - INTERVAL '90 days'
+                GROUP BY day_of_week, hour_of_day
+                HAVING COUNT(*) >= 3
+                ORDER BY avg_engagement DESC
+                LIMIT 10
+            """, FACEBOOK_PAGE_ID)
+
+        if not optimal_times:
+            return {
+                "message": "Not enough data yet. Post regularly for 2-3 weeks to get recommendations.",
+                "optimal_times": []
+            }
+
+        # Format results (ISODOW: 1 = Monday ... 7 = Sunday)
+        day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+        formatted_times = []
+        for time in optimal_times:
+            formatted_times.append({
+                "day": day_names[int(time["day_of_week"]) - 1],
+                "hour": f"{int(time['hour_of_day']):02d}:00",
+                "avg_engagement_rate": float(time["avg_engagement"]),
+                "avg_reach": int(time["avg_reach"]),
+                "sample_size": int(time["post_count"])
+            })
+
+        return {
+            "optimal_times": formatted_times,
+            "recommendation": f"Best time to post: {formatted_times[0]['day']} at {formatted_times[0]['hour']}"
+        }
+
+    except Exception as e:
+        return {"error": f"Failed to calculate optimal times: {str(e)}"}
+
+
+if __name__ == "__main__":
+    # Run the MCP server (stdio by default, --transport http for network mode)
+    run_server(mcp)
@@ -0,0 +1,162 @@
+"""
+Compact encoding for daily audience demographics snapshots
+Stored in instagram_insights.audience_demographics, one snapshot per account and day.
+
+A snapshot is either a keyframe or a delta:
+
+    {"v": 1, "type": "keyframe", "chain": 0,
+     "keys":   {"countries": ["DE", "GB", "US"], ...},      sorted key dictionary
+     "values": {"countries": [120, 340, 2210], ...}}        counts aligned with keys
+
+    {"v": 1, "type": "delta", "chain": 3, "base": "2024-05-01",
+     "added":   {"cities": ["Cluj-Napoca, Romania"]},       keys new since the base
+     "changes": {"countries": [0, 4, 2, -1]}}               [index, delta, index, delta, ...]
+
+A delta's dictionary is the sorted union of its base's dictionary and `added`;
+indices point into it. Keys that drop out of Graph's top lists fall to zero
+and stay in the dictionary until the next keyframe. A keyframe is written
+every KEYFRAME_INTERVAL snapshots, or sooner when a delta would not be much
+smaller, so replays stay short. The first snapshot of each calendar month is
+always a keyframe: partition maintenance keeps only keyframes of compacted
+months, and later months must not depend on them.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+ENCODING_VERSION = 1
+DIMENSIONS = ("cities", "countries", "gender_age")
+KEYFRAME_INTERVAL = 30
+
+# Replay state: {"chain": int, "keys": {dim: [sorted keys]}, "counts": {dim: {key: count}}}
+State = Dict[str, Any]
+
+
+def _keyframe(demographics: Dict[str, Dict[str, int]]) -> Tuple[dict, State]:
+    keys = {dim: sorted(k for k, v in demographics.get(dim, {}).items() if v) for dim in DIMENSIONS}
+    counts = {dim: {k: int(demographics[dim][k]) for k in keys[dim]} for dim in DIMENSIONS}
+    encoded = {
+        "v": ENCODING_VERSION,
+        "type": "keyframe",
+        "chain": 0,
+        "keys": keys,
+        "values": {dim: [counts[dim][k] for k in keys[dim]] for dim in DIMENSIONS},
+    }
+    return encoded, {"chain": 0, "keys": keys, "counts": counts}
+
+
+def _delta(previous: State, demographics: Dict[str, Dict[str, int]], base_date: str) -> Tuple[dict, State]:
+    added = {}
+    changes = {}
+    keys = {}
+    counts = {}
+
+    for dim in DIMENSIONS:
+        current = {k: int(v) for k, v in demographics.get(dim, {}).items() if v}
+        known = previous["keys"][dim]
+        new_keys = sorted(set(current) - set(known))
+        keys[dim] = sorted(set(known) | set(new_keys))
+        counts[dim] = current
+
+        pairs: List[int] = []
+        for index, key in enumerate(keys[dim]):
+            change = current.get(key, 0) - previous["counts"][dim].get(key, 0)
+            if change:
+                pairs.extend([index, change])
+
+        if new_keys:
+            added[dim] = new_keys
+        if pairs:
+            changes[dim] = pairs
+
+    chain = previous["chain"] + 1
+    encoded = {
+        "v": ENCODING_VERSION,
+        "type": "delta",
+        "chain": chain,
+        "base": base_date,
+        "added": added,
+        "changes": changes,
+    }
+    return encoded, {"chain": chain, "keys": keys, "counts": counts}
+
+
+def encode_snapshot(previous: Optional[State], demographics: Dict[str, Dict[str, int]],
+                    base_date: Optional[str], snapshot_date: Optional[str] = None) -> Tuple[dict, State]:
+    """
+    Encode today's demographics against the previous snapshot's replayed state.
+
+    `base_date` and `snapshot_date` are ISO dates of the previous and the new
+    snapshot; a new month starts a new keyframe.
+
+    Returns (JSON-ready snapshot, new state).
+    """
+    keyframe, keyframe_state = _keyframe(demographics)
+    if previous is None or previous["chain"] + 1 >= KEYFRAME_INTERVAL:
+        return keyframe, keyframe_state
+    if base_date and snapshot_date and base_date[:7] != snapshot_date[:7]:
+        return keyframe, keyframe_state
+
+    delta, delta_state = _delta(previous, demographics, base_date)
+    # A delta that saves little is not worth lengthening the replay chain
+    if len(json.dumps(delta)) * 2 > len(json.dumps(keyframe)):
+        return keyframe, keyframe_state
+    return delta, delta_state
+
+
+def apply_snapshot(state: Optional[State], encoded: dict) -> State:
+    """Replay one stored snapshot on top of the state of the snapshot before it"""
+    if encoded.get("v") != ENCODING_VERSION:
+        raise ValueError(f"Unsupported demographics encoding: {encoded.get('v')}")
+
+    if encoded["type"] == "keyframe":
+        keys = {dim: list(encoded["keys"].get(dim, [])) for dim in DIMENSIONS}
+        values = encoded["values"]
+        return {
+            "chain": 0,
+            "keys": keys,
+            "counts": {dim: dict(zip(keys[dim], values.get(dim, []))) for dim in DIMENSIONS},
+        }
+
+    if state is None:
+        raise ValueError("Demographics delta without a preceding keyframe")
+
+    keys = {}
+    counts = {}
+    for dim in DIMENSIONS:
+        keys[dim] = sorted(set(state["keys"][dim]) | set(encoded["added"].get(dim, [])))
+        counts[dim] = dict(state["counts"][dim])
+        pairs = encoded["changes"].get(dim, [])
+        for index, change in zip(pairs[::2], pairs[1::2]):
+            key = keys[dim][index]
+            counts[dim][key] = counts[dim].get(key, 0) + change
+        counts[dim] = {k: v for k, v in counts[dim].items() if v}
+    return {"chain": encoded["chain"], "keys": keys, "counts": counts}
+
+
+def replay_state(rows: List[Tuple[Any, dict]]) -> Optional[State]:
+    """State after replaying (date, snapshot) rows; None if there are none"""
+    state = None
+    for _, encoded in rows:
+        state = apply_snapshot(state, encoded)
+    return state
+
+
+def replay(rows: List[Tuple[Any, dict]]) -> List[Tuple[Any, Dict[str, Dict[str, int]]]]:
+    """
+    Replay (date, snapshot) rows in date order, starting at a keyframe.
+
+    Returns (date, demographics) for every row.
+    """
+    state = None
+    history = []
+    for snapshot_date, encoded in rows:
+        state = apply_snapshot(state, encoded)
+        history.append((snapshot_date, {dim: dict(state["counts"][dim]) for dim in DIMENSIONS}))
+    return history
+
+
+def shares(counts: Dict[str, int]) -> Dict[str, float]:
+    """Each key's share of the dimension total, in percent"""
+    total = sum(counts.values())
+    return {k: v * 100.0 / total for k, v in counts.items()} if total else {}
@@ -5,66 +5,31 @@ Exposes tools for retrieving Instagram Business Account insights and performance
 
 import os
 import json
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from typing import Optional, List, Dict, Any
-import requests
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import redis
 from fastmcp import FastMCP
 
+from demographics import DIMENSIONS, encode_snapshot, replay, replay_state, shares
+from shared.cache import cache_get, cache_set
+from shared.db import get_db_connection, bulk_upsert, ensure_social_account
+from shared.graph import make_graph_api_request, paginate, parse_graph_timestamp, resolve_date_range
+from shared.metrics import instrument_tool
+from shared.serve import run_server
+
 # Initialize MCP server
 mcp = FastMCP("Instagram Analytics")
 
 # Environment variables
-META_ACCESS_TOKEN = os.getenv("META_ACCESS_TOKEN")
 INSTAGRAM_BUSINESS_ACCOUNT_ID = os.getenv("INSTAGRAM_BUSINESS_ACCOUNT_ID")
-DATABASE_URL = os.getenv("DATABASE_URL")
-REDIS_URL = os.getenv("REDIS_URL")
-
-# Graph API base URL
-GRAPH_API_URL = "https://graph.facebook.com/v18.0"
-
-# Initialize Redis connection
-redis_client = redis.from_url(REDIS_URL) if REDIS_URL else None
-
-
-def get_db_connection():
-    """Create database connection"""
-    return psycopg2.connect(DATABASE_URL)
-
-
-def cache_get(key: str) -> Optional[str]:
-    """Get cached value from Redis"""
-    if redis_client:
-        try:
-            return redis_client.get(key)
-        except Exception as e:
-            print(f"Redis get error: {e}")
-    return None
-
-
-def cache_set(key: str, value: str, expiry: int = 3600):
-    """Set cached value in Redis with expiry in seconds"""
-    if redis_client:
-        try:
-            redis_client.setex(key, expiry, value)
-        except Exception as e:
-            print(f"Redis set error: {e}")
-
 
-def make_graph_api_request(endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
-    """Make request to Facebook Graph API"""
-    params["access_token"] = META_ACCESS_TOKEN
-    url = f"{GRAPH_API_URL}/{endpoint}"
-
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    return response.json()
+# Number of recent posts pulled from the Graph API for ranking
+POST_FETCH_LIMIT = 50
 
 
 @mcp.tool()
-def get_account_insights(date_range: str = "last_7_days") -> Dict[str, Any]:
+@instrument_tool
+async def get_account_insights(date_range: str = "last_7_days") -> Dict[str, Any]:
     """
     Get Instagram Business Account insights for a specified date range.
 
@@ -75,26 +40,14 @@ def get_account_insights(date_range: str = "last_7_days") -> Dict[str, Any]:
         Dictionary containing account metrics (impressions, reach, profile views, etc.)
     """
     # Calculate date range
-    today = datetime.now().date()
-
-    if date_range == "today":
-        start_date = today
-        end_date = today
-    elif date_range == "yesterday":
-        start_date = today - timedelta(days=1)
-        end_date = today - timedelta(days=1)
-    elif date_range == "last_7_days":
-        start_date = today - timedelta(days=7)
-        end_date = today - timedelta(days=1)
-    elif date_range == "last_30_days":
-        start_date = today - timedelta(days=30)
-        end_date = today - timedelta(days=1)
-    else:
+    dates = resolve_date_range(date_range)
+    if not dates:
         return {"error": "Invalid date_range. Use: today, yesterday, last_7_days, last_30_days"}
+    start_date, end_date = dates
 
     # Check cache
     cache_key = f"instagram_insights:{INSTAGRAM_BUSINESS_ACCOUNT_ID}:{date_range}"
-    cached = cache_get(cache_key)
+    cached = await cache_get(cache_key)
     if cached:
         return json.loads(cached)
 
@@ -118,7 +71,7 @@ def get_account_insights(date_range: str = "last_7_days") -> Dict[str, Any]:
             "until": int(end_date.strftime("%s"))
         }
 
-        data = make_graph_api_request(
+        data = await make_graph_api_request(
             f"{INSTAGRAM_BUSINESS_ACCOUNT_ID}/insights",
             params
         )
@@ -141,60 +94,49 @@ def get_account_insights(date_range: str = "last_7_days") -> Dict[str, Any]:
             result["metrics"][metric_name] = total
 
         # Cache for 1 hour
-        cache_set(cache_key, json.dumps(result), 3600)
-
-        # Store in database
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                # Get or create social account
-                cur.execute("""
-                    INSERT INTO social_accounts (platform, account_id, is_active)
-                    VALUES ('instagram', %s, true)
-                    ON CONFLICT (platform, account_id) DO NOTHING
-                    RETURNING id
-                """, (INSTAGRAM_BUSINESS_ACCOUNT_ID,))
-
-                # Store daily insights
-                for single_date in [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]:
-                    cur.execute("""
-                        INSERT INTO instagram_insights (
-                            account_id,
-                            date,
-                            followers_count,
-                            impressions,
-                            reach,
-                            profile_views,
-                            website_clicks,
-                            email_contacts,
-                            phone_calls,
-                            get_directions_clicks
-                        ) VALUES (
-                            (SELECT id FROM social_accounts WHERE platform='instagram' AND account_id=%s),
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        )
-                        ON CONFLICT (account_id, date) DO UPDATE SET
-                            followers_count = EXCLUDED.followers_count,
-                            impressions = EXCLUDED.impressions,
-                            reach = EXCLUDED.reach,
-                            profile_views = EXCLUDED.profile_views,
-                            website_clicks = EXCLUDED.website_clicks,
-                            email_contacts = EXCLUDED.email_contacts,
-                            phone_calls = EXCLUDED.phone_calls,
-                            get_directions_clicks = EXCLUDED.get_directions_clicks,
-                            updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        INSTAGRAM_BUSINESS_ACCOUNT_ID,
-                        single_date,
-                        result["metrics"].get("follower_count", 0),
-                        result["metrics"].get("impressions", 0),
-                        result["metrics"].get("reach", 0),
-                        result["metrics"].get("profile_views", 0),
-                        result["metrics"].get("website_clicks", 0),
-                        result["metrics"].get("email_contacts", 0),
-                        result["metrics"].get("phone_call_clicks", 0),
-                        result["metrics"].get("get_directions_clicks", 0)
-                    ))
-                conn.commit()
+        await cache_set(cache_key, json.dumps(result), 3600)
+
+        # Store in database - one row per day, written in a single round trip
+        async with get_db_connection() as conn:
+            account_uuid = await ensure_social_account(conn, "instagram", INSTAGRAM_BUSINESS_ACCOUNT_ID)
+
+            await bulk_upsert(conn, """
+                INSERT INTO instagram_insights (
+                    account_id,
+                    date,
+                    followers_count,
+                    impressions,
+                    reach,
+                    profile_views,
+                    website_clicks,
+                    email_contacts,
+                    phone_calls,
+                    get_directions_clicks
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                ON CONFLICT (account_id, date) DO UPDATE SET
+                    followers_count = EXCLUDED.followers_count,
+                    impressions = EXCLUDED.impressions,
+                    reach = EXCLUDED.reach,
+                    profile_views = EXCLUDED.profile_views,
+                    website_clicks = EXCLUDED.website_clicks,
+                    email_contacts = EXCLUDED.email_contacts,
+                    phone_calls = EXCLUDED.phone_calls,
+                    get_directions_clicks = EXCLUDED.get_directions_clicks
+            """, [
+                (
+                    account_uuid,
+                    single_date,
+                    result["metrics"].get("follower_count", 0),
+                    result["metrics"].get("impressions", 0),
+                    result["metrics"].get("reach", 0),
+                    result["metrics"].get("profile_views", 0),
+                    result["metrics"].get("website_clicks", 0),
+                    result["metrics"].get("email_contacts", 0),
+                    result["metrics"].get("phone_call_clicks", 0),
+                    result["metrics"].get("get_directions_clicks", 0)
+                )
+                for single_date in [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
+            ])
 
         return result
 
@@ -203,7 +145,8 @@ def get_account_insights(date_range: str = "last_7_days") -> Dict[str, Any]:
 
 
 @mcp.tool()
-def analyze_post_performance(limit: int = 10, sort_by: str = "engagement_rate") -> Dict[str, Any]:
+@instrument_tool
+async def analyze_post_performance(limit: int = 10, sort_by: str = "engagement_rate") -> Dict[str, Any]:
     """
     Analyze top-performing Instagram posts.
 
@@ -215,90 +158,86 @@ def analyze_post_performance(limit: int = 10, sort_by: str = "engagement_rate")
         List of top-performing posts with metrics
     """
     try:
-        # Fetch recent media from Graph API
+        # Fetch recent media from Graph API (more than `limit` to have data to sort)
         params = {
-            "fields": "id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count,insights.metric(impressions,reach,engagement,saved)",
-            "limit": 50  # Fetch more to have data to sort
+            "fields": "id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count,insights.metric(impressions,reach,engagement,saved)"
         }
 
-        data = make_graph_api_request(
+        media_items = await paginate(
             f"{INSTAGRAM_BUSINESS_ACCOUNT_ID}/media",
-            params
+            params,
+            max(limit, POST_FETCH_LIMIT)
         )
 
         posts = []
 
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                for media in data.get("data", []):
-                    # Extract insights
-                    insights = {}
-                    for insight in media.get("insights", {}).get("data", []):
-                        insights[insight["name"]] = insight["values"][0]["value"]
-
-                    # Calculate engagement rate
-                    impressions = insights.get("impressions", 0)
-                    engagement = insights.get("engagement", 0)
-                    engagement_rate = (engagement / impressions * 100) if impressions > 0 else 0
-
-                    # Extract hashtags from caption
-                    caption = media.get("caption", "")
-                    hashtags = [word for word in caption.split() if word.startswith("#")]
-
-                    post_data = {
-                        "post_id": media["id"],
-                        "caption": caption,
-                        "media_type": media.get("media_type"),
-                        "media_url": media.get("media_url"),
-                        "permalink": media.get("permalink"),
-                        "timestamp": media.get("timestamp"),
-                        "like_count": media.get("like_count", 0),
-                        "comment_count": media.get("comments_count", 0),
-                        "impressions": impressions,
-                        "reach": insights.get("reach", 0),
-                        "engagement_rate": round(engagement_rate, 2),
-                        "saved_count": insights.get("saved", 0),
-                        "hashtags": hashtags
-                    }
-
-                    posts.append(post_data)
-
-                    # Store in database
-                    cur.execute("""
-                        INSERT INTO instagram_posts (
-                            post_id, account_id, caption, media_type, media_url,
-                            permalink, timestamp, like_count, comment_count,
-                            reach, impressions, engagement_rate, saved_count, hashtags
-                        ) VALUES (
-                            %s,
-                            (SELECT id FROM social_accounts WHERE platform='instagram' AND account_id=%s),
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        )
-                        ON CONFLICT (post_id) DO UPDATE SET
-                            like_count = EXCLUDED.like_count,
-                            comment_count = EXCLUDED.comment_count,
-                            reach = EXCLUDED.reach,
-                            impressions = EXCLUDED.impressions,
-                            saved_count = EXCLUDED.saved_count,
-                            updated_at = CURRENT_TIMESTAMP
-                    """, (
-                        post_data["post_id"],
-                        INSTAGRAM_BUSINESS_ACCOUNT_ID,
-                        post_data["caption"],
-                        post_data["media_type"],
-                        post_data["media_url"],
-                        post_data["permalink"],
-                        post_data["timestamp"],
-                        post_data["like_count"],
-                        post_data["comment_count"],
-                        post_data["reach"],
-                        post_data["impressions"],
-                        post_data["engagement_rate"],
-                        post_data["saved_count"],
-                        post_data["hashtags"]
-                    ))
-
-                conn.commit()
+        for media in media_items:
+            # Extract insights
+            insights = {}
+            for insight in media.get("insights", {}).get("data", []):
+                insights[insight["name"]] = insight["values"][0]["value"]
+
+            # Calculate engagement rate
+            impressions = insights.get("impressions", 0)
+            engagement = insights.get("engagement", 0)
+            engagement_rate = (engagement / impressions * 100) if impressions > 0 else 0
+
+            # Extract hashtags from caption
+            caption = media.get("caption", "")
+            hashtags = [word for word in caption.split() if word.startswith("#")]
+
+            posts.append({
+                "post_id": media["id"],
+                "caption": caption,
+                "media_type": media.get("media_type"),
+                "media_url": media.get("media_url"),
+                "permalink": media.get("permalink"),
+                "timestamp": media.get("timestamp"),
+                "like_count": media.get("like_count", 0),
+                "comment_count": media.get("comments_count", 0),
+                "impressions": impressions,
+                "reach": insights.get("reach", 0),
+                "engagement_rate": round(engagement_rate, 2),
+                "saved_count": insights.get("saved", 0),
+                "hashtags": hashtags
+            })
+
+        # Store in database - all posts in a single round trip
+        async with get_db_connection() as conn:
+            account_uuid = await ensure_social_account(conn, "instagram", INSTAGRAM_BUSINESS_ACCOUNT_ID)
+
+            await bulk_upsert(conn, """
+                INSERT INTO instagram_posts (
+                    post_id, account_id, caption, media_type, media_url,
+                    permalink, timestamp, like_count, comment_count,
+                    reach, impressions, engagement_rate, saved_count, hashtags
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+                ON CONFLICT (post_id, timestamp) DO UPDATE SET
+                    like_count = EXCLUDED.like_count,
+                    comment_count = EXCLUDED.comment_count,
+                    reach = EXCLUDED.reach,
+                    impressions = EXCLUDED.impressions,
+                    saved_count = EXCLUDED.saved_count,
+                    updated_at = CURRENT_TIMESTAMP
+            """, [
+                (
+                    post_data["post_id"],
+                    account_uuid,
+                    post_data["caption"],
+                    post_data["media_type"],
+                    post_data["media_url"],
+                    post_data["permalink"],
+                    parse_graph_timestamp(post_data["timestamp"]),
+                    post_data["like_count"],
+                    post_data["comment_count"],
+                    post_data["reach"],
+                    post_data["impressions"],
+                    Decimal(str(post_data["engagement_rate"])),
+                    post_data["saved_count"],
+                    post_data["hashtags"]
+                )
+                for post_data in posts
+            ])
 
         # Sort posts
         valid_sort_keys = ["engagement_rate", "reach", "impressions", "like_count"]
@@ -318,7 +257,8 @@ def analyze_post_performance(limit: int = 10, sort_by: str = "engagement_rate")
 
 
 @mcp.tool()
-def get_optimal_posting_times() -> Dict[str, Any]:
+@instrument_tool
+async def get_optimal_posting_times() -> Dict[str, Any]:
     """
     Analyze historical data to determine optimal posting times.
 
@@ -326,60 +266,58 @@ def get_optimal_posting_times() -> Dict[str, Any]:
         Recommended posting times based on when your audience is most active
     """
     try:
-        with get_db_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # Get posts with their engagement metrics
-                cur.execute("""
-                    SELECT
-                        EXTRACT(DOW FROM timestamp) as day_of_week,
-                        EXTRACT(HOUR FROM timestamp) as hour_of_day,
-                        AVG(engagement_rate) as avg_engagement,
-                        AVG(reach) as avg_reach,
-                        COUNT(*) as post_count
-                    FROM instagram_posts
-                    WHERE account_id = (
-                        SELECT id FROM social_accounts
-                        WHERE platform='instagram' AND account_id=%s
-                    )
-                    AND timestamp > NOW() - INTERVAL '90 days'
-                    GROUP BY day_of_week, hour_of_day
-                    HAVING COUNT(*) >= 3
-                    ORDER BY avg_engagement DESC
-                    LIMIT 10
-                """, (INSTAGRAM_BUSINESS_ACCOUNT_ID,))
-
-                optimal_times = cur.fetchall()
-
-                if not optimal_times:
-                    return {
-                        "message": "Not enough data yet. Post regularly for 2-3 weeks to get recommendations.",
-                        "optimal_times": []
-                    }
-
-                # Format results
-                day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-
-                formatted_times = []
-                for time in optimal_times:
-                    formatted_times.append({
-                        "day": day_names[int(time["day_of_week"])],
-                        "hour": f"{int(time['hour_of_day']):02d}:00",
-                        "avg_engagement_rate": float(time["avg_engagement"]),
-                        "avg_reach": int(time["avg_reach"]),
-                        "sample_size": int(time["post_count"])
-                    })
-
-                return {
-                    "optimal_times": formatted_times,
-                    "recommendation": f"Best time to post: {formatted_times[0]['day']} at {formatted_times[0]['hour']}"
-                }
+        async with get_db_connection() as conn:
+            # Get posts with their engagement metrics
+            optimal_times = await conn.fetch("""
+                SELECT
+                    EXTRACT(DOW FROM timestamp) as day_of_week,
+                    EXTRACT(HOUR FROM timestamp) as hour_of_day,
+                    AVG(engagement_rate) as avg_engagement,
+                    AVG(reach) as avg_reach,
+                    COUNT(*) as post_count
+                FROM instagram_posts
+                WHERE account_id = (
+                    SELECT id FROM social_accounts
+                    WHERE platform='instagram' AND account_id=$1
+                )
+                AND timestamp > NOW() - INTERVAL '90 days'
+                GROUP BY day_of_week, hour_of_day
+                HAVING COUNT(*) >= 3
+                ORDER BY avg_engagement DESC
+                LIMIT 10
+            """, INSTAGRAM_BUSINESS_ACCOUNT_ID)
+
+        if not optimal_times:
+            return {
+                "message": "Not enough data yet. Post regularly for 2-3 weeks to get recommendations.",
+                "optimal_times": []
+            }
+
+        # Format results
+        day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+        formatted_times = []
+        for time in optimal_times:
+            formatted_times.append({
+                "day": day_names[int(time["day_of_week"])],
+                "hour": f"{int(time['hour_of_day']):02d}:00",
+                "avg_engagement_rate": float(time["avg_engagement"]),
+                "avg_reach": int(time["avg_reach"]),
+                "sample_size": int(time["post_count"])
+            })
+
+        return {
+            "optimal_times": formatted_times,
+            "recommendation": f"Best time to post: {formatted_times[0]['day']} at {formatted_times[0]['hour']}"
+        }
 
     except Exception as e:
         return {"error": f"Failed to calculate optimal times: {str(e)}"}
 
 
 @mcp.tool()
-def track_hashtag_performance(hashtags: List[str]) -> Dict[str, Any]:
+@instrument_tool
+async def track_hashtag_performance(hashtags: List[str]) -> Dict[str, Any]:
     """
     Analyze performance of specific hashtags across your posts.
 
@@ -390,61 +328,178 @@ def track_hashtag_performance(hashtags: List[str]) -> Dict[str, Any]:
         Performance metrics for each hashtag
     """
     try:
-        with get_db_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                results = {}
-
-                for hashtag in hashtags:
-                    # Ensure hashtag starts with #
-                    if not hashtag.startswith("#"):
-                        hashtag = f"#{hashtag}"
-
-                    cur.execute("""
-                        SELECT
-                            COUNT(*) as usage_count,
-                            AVG(engagement_rate) as avg_engagement,
-                            AVG(reach) as avg_reach,
-                            AVG(impressions) as avg_impressions,
-                            SUM(like_count) as total_likes,
-                            SUM(comment_count) as total_comments
-                        FROM instagram_posts
-                        WHERE account_id = (
-                            SELECT id FROM social_accounts
-                            WHERE platform='instagram' AND account_id=%s
-                        )
-                        AND %s = ANY(hashtags)
-                    """, (INSTAGRAM_BUSINESS_ACCOUNT_ID, hashtag))
-
-                    data = cur.fetchone()
-
-                    results[hashtag] = {
-                        "usage_count": int(data["usage_count"]) if data["usage_count"] else 0,
-                        "avg_engagement_rate": float(data["avg_engagement"]) if data["avg_engagement"] else 0,
-                        "avg_reach": int(data["avg_reach"]) if data["avg_reach"] else 0,
-                        "avg_impressions": int(data["avg_impressions"]) if data["avg_impressions"] else 0,
-                        "total_likes": int(data["total_likes"]) if data["total_likes"] else 0,
-                        "total_comments": int(data["total_comments"]) if data["total_comments"] else 0
-                    }
-
-                # Sort by engagement rate
-                sorted_hashtags = sorted(
-                    results.items(),
-                    key=lambda x: x[1]["avg_engagement_rate"],
-                    reverse=True
+        # Ensure hashtags start with #
+        normalized = [hashtag if hashtag.startswith("#") else f"#{hashtag}" for hashtag in hashtags]
+
+        async with get_db_connection() as conn:
+            # All hashtags in one query instead of one round trip each. Posts in
+            # compacted months only survive as monthly sums, so averages are
+            # rebuilt from sums and counts across both.
+            rows = await conn.fetch("""
+                WITH tags AS (
+                    SELECT DISTINCT unnest($2::text[]) AS hashtag
+                ), account AS (
+                    SELECT id FROM social_accounts
+                    WHERE platform='instagram' AND account_id=$1
+                ), totals AS (
+                    SELECT
+                        h.hashtag,
+                        COUNT(*) as post_count,
+                        SUM(p.engagement_rate) as engagement_rate_sum,
+                        COUNT(p.engagement_rate) as engagement_rate_count,
+                        SUM(p.reach) as total_reach,
+                        SUM(p.impressions) as total_impressions,
+                        SUM(p.like_count) as total_likes,
+                        SUM(p.comment_count) as total_comments
+                    FROM tags h
+                    JOIN instagram_posts p
+                        ON p.account_id = (SELECT id FROM account)
+                        AND p.hashtags @> ARRAY[h.hashtag]
+                    GROUP BY h.hashtag
+                    UNION ALL
+                    SELECT
+                        m.hashtag,
+                        SUM(m.post_count),
+                        SUM(m.engagement_rate_sum),
+                        SUM(m.engagement_rate_count),
+                        SUM(m.total_reach),
+                        SUM(m.total_impressions),
+                        SUM(m.total_likes),
+                        SUM(m.total_comments)
+                    FROM instagram_hashtags_monthly m
+                    JOIN tags h ON h.hashtag = m.hashtag
+                    WHERE m.account_id = (SELECT id FROM account)
+                    GROUP BY m.hashtag
                 )
+                SELECT
+                    h.hashtag,
+                    SUM(t.post_count) as usage_count,
+                    SUM(t.engagement_rate_sum) / NULLIF(SUM(t.engagement_rate_count), 0) as avg_engagement,
+                    SUM(t.total_reach) / NULLIF(SUM(t.post_count), 0) as avg_reach,
+                    SUM(t.total_impressions) / NULLIF(SUM(t.post_count), 0) as avg_impressions,
+                    SUM(t.total_likes) as total_likes,
+                    SUM(t.total_comments) as total_comments
+                FROM tags h
+                LEFT JOIN totals t ON t.hashtag = h.hashtag
+                GROUP BY h.hashtag
+            """, INSTAGRAM_BUSINESS_ACCOUNT_ID, normalized)
+
+        results = {}
+        for data in rows:
+            results[data["hashtag"]] = {
+                "usage_count": int(data["usage_count"]) if data["usage_count"] else 0,
+                "avg_engagement_rate": float(data["avg_engagement"]) if data["avg_engagement"] else 0,
+                "avg_reach": int(data["avg_reach"]) if data["avg_reach"] else 0,
+                "avg_impressions": int(data["avg_impressions"]) if data["avg_impressions"] else 0,
+                "total_likes": int(data["total_likes"]) if data["total_likes"] else 0,
+                "total_comments": int(data["total_comments"]) if data["total_comments"] else 0
+            }
+
+        # Sort by engagement rate
+        sorted_hashtags = sorted(
+            results.items(),
+            key=lambda x: x[1]["avg_engagement_rate"],
+            reverse=True
+        )
 
-                return {
-                    "hashtags_analyzed": len(hashtags),
-                    "performance": dict(sorted_hashtags),
-                    "best_performing": sorted_hashtags[0][0] if sorted_hashtags else None
-                }
+        return {
+            "hashtags_analyzed": len(hashtags),
+            "performance": dict(sorted_hashtags),
+            "best_performing": sorted_hashtags[0][0] if sorted_hashtags else None
+        }
 
     except Exception as e:
         return {"error": f"Failed to track hashtags: {str(e)}"}
 
 
+# Snapshots from the latest keyframe on or before $2 through $3, for replaying.
+# The view adds the keyframes kept from compacted months.
+SNAPSHOTS_SQL = """
+    SELECT date, audience_demographics
+    FROM instagram_demographics_snapshots
+    WHERE account_id = $1
+        AND date <= $3
+        AND date >= COALESCE((
+            SELECT max(date) FROM instagram_demographics_snapshots
+            WHERE account_id = $1
+                AND date <= $2
+                AND audience_demographics->>'type' = 'keyframe'
+        ), $2)
+    ORDER BY date
+"""
+
+
+async def fetch_audience_demographics() -> Dict[str, Dict[str, int]]:
+    """Fetch lifetime audience breakdowns from the Graph API"""
+    params = {
+        "metric": "audience_city,audience_country,audience_gender_age",
+        "period": "lifetime"
+    }
+
+    data = await make_graph_api_request(
+        f"{INSTAGRAM_BUSINESS_ACCOUNT_ID}/insights",
+        params
+    )
+
+    demographics = {
+        "cities": {},
+        "countries": {},
+        "gender_age": {}
+    }
+
+    for metric_data in data.get("data", []):
+        metric_name = metric_data["name"]
+        if metric_data.get("values"):
+            value = metric_data["values"][0].get("value", {})
+
+            if metric_name == "audience_city":
+                demographics["cities"] = value
+            elif metric_name == "audience_country":
+                demographics["countries"] = value
+            elif metric_name == "audience_gender_age":
+                demographics["gender_age"] = value
+
+    return demographics
+
+
+async def load_demographics_snapshots(conn, account_uuid, start: date, end: date) -> List[tuple]:
+    """Stored (date, snapshot) rows needed to replay the window [start, end]"""
+    rows = await conn.fetch(SNAPSHOTS_SQL, account_uuid, start, end)
+    return [(row["date"], json.loads(row["audience_demographics"])) for row in rows]
+
+
+async def record_demographics_snapshot(demographics: Dict[str, Dict[str, int]]) -> str:
+    """
+    Store today's demographics as a compact snapshot (see demographics.py).
+
+    Rewrites today's snapshot if it already exists; returns "keyframe" or "delta".
+    """
+    today = datetime.now().date()
+
+    async with get_db_connection() as conn:
+        account_uuid = await ensure_social_account(conn, "instagram", INSTAGRAM_BUSINESS_ACCOUNT_ID)
+        # Deltas depend on the previous snapshot, so snapshots of one account are written one at a time
+        await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", f"demographics:{account_uuid}")
+
+        yesterday = today - timedelta(days=1)
+        rows = await load_demographics_snapshots(conn, account_uuid, yesterday, yesterday)
+        previous = replay_state(rows)
+        base_date = str(rows[-1][0]) if rows else None
+
+        encoded, _ = encode_snapshot(previous, demographics, base_date, str(today))
+        await conn.execute("""
+            INSERT INTO instagram_insights (account_id, date, audience_demographics)
+            VALUES ($1, $2, $3::jsonb)
+            ON CONFLICT (account_id, date) DO UPDATE SET
+                audience_demographics = EXCLUDED.audience_demographics
+        """, account_uuid, today, json.dumps(encoded, separators=(",", ":")))
+
+    return encoded["type"]
+
+
 @mcp.tool()
-def get_audience_demographics() -> Dict[str, Any]:
+@instrument_tool
+async def get_audience_demographics() -> Dict[str, Any]:
     """
     Get demographic information about your Instagram audience.
 
@@ -452,39 +507,13 @@ def get_audience_demographics() -> Dict[str, Any]:
         Audience demographics including age, gender, location
     """
     cache_key = f"instagram_demographics:{INSTAGRAM_BUSINESS_ACCOUNT_ID}"
-    cached = cache_get(cache_key)
+    cached = await cache_get(cache_key)
     if cached:
         return json.loads(cached)
 
     try:
         # Fetch audience demographics from Graph API
-        params = {
-            "metric": "audience_city,audience_country,audience_gender_age",
-            "period": "lifetime"
-        }
-
-        data = make_graph_api_request(
-            f"{INSTAGRAM_BUSINESS_ACCOUNT_ID}/insights",
-            params
-        )
-
-        demographics = {
-            "cities": {},
-            "countries": {},
-            "gender_age": {}
-        }
-
-        for metric_data in data.get("data", []):
-            metric_name = metric_data["name"]
-            if metric_data.get("values"):
-                value = metric_data["values"][0].get("value", {})
-
-                if metric_name == "audience_city":
-                    demographics["cities"] = value
-                elif metric_name == "audience_country":
-                    demographics["countries"] = value
-                elif metric_name == "audience_gender_age":
-                    demographics["gender_age"] = value
+        demographics = await fetch_audience_demographics()
 
         result = {
             "account_id": INSTAGRAM_BUSINESS_ACCOUNT_ID,
@@ -493,8 +522,11 @@ def get_audience_demographics() -> Dict[str, Any]:
             "top_country": max(demographics["countries"].items(), key=lambda x: x[1])[0] if demographics["countries"] else None
         }
 
+        # Keep the history for get_demographics_trend
+        await record_demographics_snapshot(demographics)
+
         # Cache for 24 hours (demographics don't change frequently)
-        cache_set(cache_key, json.dumps(result), 86400)
+        await cache_set(cache_key, json.dumps(result), 86400)
 
         return result
 
@@ -502,6 +534,111 @@ def get_audience_demographics() -> Dict[str, Any]:
         return {"error": f"Failed to fetch demographics: {str(e)}"}
 
 
+@mcp.tool()
+@instrument_tool
+async def get_demographics_trend(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    dimension: str = "countries",
+    top_n: int = 10
+) -> Dict[str, Any]:
+    """
+    Show how your Instagram audience shifted between two dates.
+
+    Args:
+        start_date: Window start, YYYY-MM-DD (default: 30 days before end_date)
+        end_date: Window end, YYYY-MM-DD (default: today)
+        dimension: 'countries', 'cities' or 'gender_age'
+        top_n: Number of biggest shifts to return
+
+    Returns:
+        Audience size change, the biggest share shifts and a daily timeline
+    """
+    if dimension not in DIMENSIONS:
+        return {"error": f"Unknown dimension '{dimension}'. Use one of: {', '.join(DIMENSIONS)}"}
+
+    try:
+        end = date.fromisoformat(end_date) if end_date else datetime.now().date()
+        start = date.fromisoformat(start_date) if start_date else end - timedelta(days=30)
+        if start > end:
+            return {"error": "start_date must be on or before end_date"}
+
+        async with get_db_connection() as conn:
+            # Read-only: an account that was never synced simply has no snapshots
+            account_uuid = await conn.fetchval("""
+                SELECT id FROM social_accounts
+                WHERE platform='instagram' AND account_id=$1
+            """, INSTAGRAM_BUSINESS_ACCOUNT_ID)
+            rows = await load_demographics_snapshots(conn, account_uuid, start, end) if account_uuid else []
+
+        history = replay(rows)
+        # Audience at the window start is the latest snapshot on or before it
+        before = [h for h in history if h[0] <= start]
+        window = [h for h in history if h[0] >= start]
+        if not window and not before:
+            return {
+                "account_id": INSTAGRAM_BUSINESS_ACCOUNT_ID,
+                "dimension": dimension,
+                "snapshots": 0,
+                "message": "No demographics snapshots in this window yet. They are recorded daily by get_audience_demographics."
+            }
+
+        start_date_used, start_state = before[-1] if before else window[0]
+        end_date_used, end_state = history[-1]
+        start_counts = start_state[dimension]
+        end_counts = end_state[dimension]
+        start_shares = shares(start_counts)
+        end_shares = shares(end_counts)
+
+        shifts = []
+        for key in set(start_counts) | set(end_counts):
+            shifts.append({
+                "key": key,
+                "start_count": start_counts.get(key, 0),
+                "end_count": end_counts.get(key, 0),
+                "count_change": end_counts.get(key, 0) - start_counts.get(key, 0),
+                "start_share": round(start_shares.get(key, 0.0), 2),
+                "end_share": round(end_shares.get(key, 0.0), 2),
+                "share_change_pts": round(end_shares.get(key, 0.0) - start_shares.get(key, 0.0), 2)
+            })
+        shifts.sort(key=lambda s: abs(s["share_change_pts"]), reverse=True)
+
+        top_keys = sorted(end_counts, key=end_counts.get, reverse=True)[:3]
+        timeline = [
+            {
+                "date": str(snapshot_date),
+                "total": sum(state[dimension].values()),
+                "top_shares": {k: round(shares(state[dimension]).get(k, 0.0), 2) for k in top_keys}
+            }
+            for snapshot_date, state in window
+        ]
+
+        start_total = sum(start_counts.values())
+        end_total = sum(end_counts.values())
+        return {
+            "account_id": INSTAGRAM_BUSINESS_ACCOUNT_ID,
+            "dimension": dimension,
+            "start_date": str(start_date_used),
+            "end_date": str(end_date_used),
+            "snapshots": len(window),
+            "audience": {
+                "start": start_total,
+                "end": end_total,
+                "change": end_total - start_total,
+                "change_pct": round((end_total - start_total) * 100.0 / start_total, 2) if start_total else None
+            },
+            "biggest_shifts": shifts[:top_n],
+            "gainers": [s["key"] for s in shifts if s["share_change_pts"] > 0][:top_n],
+            "losers": [s["key"] for s in shifts if s["share_change_pts"] < 0][:top_n],
+            "timeline": timeline
+        }
+
+    except ValueError as e:
+        return {"error": f"Invalid date or snapshot: {str(e)}"}
+    except Exception as e:
+        return {"error": f"Failed to compute demographics trend: {str(e)}"}
+
+
 if __name__ == "__main__":
-    # Run the MCP server
-    mcp.run()
+    # Run the MCP server (stdio by default, --transport http for network mode)
+    run_server(mcp)
@@ -0,0 +1,266 @@
+"""
+Media processing pipeline stages
+Runs inside worker processes: probes, resizes, watermarks and compresses media assets
+"""
+
+import os
+import json
+import time
+import subprocess
+from typing import Optional, Dict, Any, Tuple
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+# Target dimensions (max width, max height) and encoder settings per platform
+PLATFORM_VARIANTS = {
+    "instagram_feed": {"size": (1080, 1350), "jpeg_quality": 85, "video_crf": 23},
+    "instagram_story": {"size": (1080, 1920), "jpeg_quality": 85, "video_crf": 23},
+    "facebook_feed": {"size": (1200, 630), "jpeg_quality": 85, "video_crf": 23},
+    "tiktok": {"size": (1080, 1920), "jpeg_quality": 80, "video_crf": 24},
+}
+
+# Fallback font shipped with the container (fonts-dejavu-core)
+DEFAULT_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+
+def _timed(stages: Dict[str, float], stage: str, started: float):
+    """Accumulate elapsed seconds for a pipeline stage"""
+    stages[stage] = stages.get(stage, 0.0) + (time.perf_counter() - started)
+
+
+def _load_font(size: int, font_path: Optional[str]):
+    """Load the watermark font, falling back to Pillow's bitmap font"""
+    for path in (font_path, DEFAULT_FONT_PATH):
+        if path and os.path.exists(path):
+            return ImageFont.truetype(path, size)
+    return ImageFont.load_default()
+
+
+def watermark_kind(watermark: Dict[str, Any]) -> Optional[str]:
+    """Which watermark gets stamped: 'logo' if the logo file exists, else 'text', else None"""
+    if watermark.get("image_path") and os.path.exists(watermark["image_path"]):
+        return "logo"
+    if watermark.get("text"):
+        return "text"
+    return None
+
+
+def apply_image_watermark(image: Image.Image, watermark: Dict[str, Any]) -> Image.Image:
+    """Stamp a text or logo watermark in the bottom-right corner of an image"""
+    base = image.convert("RGBA")
+    overlay = Image.new("RGBA", base.size, (0, 0, 0, 0))
+    margin = max(base.width // 40, 8)
+
+    if watermark_kind(watermark) == "logo":
+        with Image.open(watermark["image_path"]) as logo:
+            logo = logo.convert("RGBA")
+            logo.thumbnail((base.width // 5, base.height // 5))
+            position = (base.width - logo.width - margin, base.height - logo.height - margin)
+            overlay.paste(logo, position, logo)
+    else:
+        draw = ImageDraw.Draw(overlay)
+        font = _load_font(max(base.width // 30, 12), watermark.get("font_path"))
+        text = watermark.get("text", "")
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        position = (base.width - (right - left) - margin, base.height - (bottom - top) - margin)
+        draw.text(position, text, font=font, fill=(255, 255, 255, int(255 * watermark.get("opacity", 0.6))))
+
+    return Image.alpha_composite(base, overlay).convert("RGB")
+
+
+def process_image(asset: Dict[str, Any], source_path: str, output_dir: str,
+                  watermark: Dict[str, Any], stages: Dict[str, float]) -> Dict[str, Any]:
+    """Generate resized, watermarked and compressed variants of an image"""
+    started = time.perf_counter()
+    with Image.open(source_path) as source:
+        original_size = source.size
+        # Let the JPEG decoder downscale while decoding - much cheaper than a full-size decode
+        largest = (
+            max(spec["size"][0] for spec in PLATFORM_VARIANTS.values()),
+            max(spec["size"][1] for spec in PLATFORM_VARIANTS.values()),
+        )
+        source.draft("RGB", largest)
+        image = ImageOps.exif_transpose(source).convert("RGB")
+    _timed(stages, "decode", started)
+
+    variants = {}
+    for platform, spec in PLATFORM_VARIANTS.items():
+        started = time.perf_counter()
+        variant = ImageOps.contain(image, spec["size"], Image.LANCZOS)
+        _timed(stages, "resize", started)
+
+        if watermark_kind(watermark):
+            started = time.perf_counter()
+            variant = apply_image_watermark(variant, watermark)
+            _timed(stages, "watermark", started)
+
+        started = time.perf_counter()
+        output_path = os.path.join(output_dir, f"{asset['id']}_{platform}.jpg")
+        variant.save(output_path, "JPEG", quality=spec["jpeg_quality"], optimize=True, progressive=True)
+        _timed(stages, "encode", started)
+
+        variants[platform] = {
+            "path": output_path,
+            "width": variant.width,
+            "height": variant.height,
+            "file_size_bytes": os.path.getsize(output_path),
+        }
+
+    return {
+        "width": original_size[0],
+        "height": original_size[1],
+        "duration_seconds": None,
+        "variants": variants,
+    }
+
+
+def probe_video(source_path: str) -> Tuple[int, int, Optional[float]]:
+    """Read video dimensions and duration with ffprobe (streams headers only)"""
+    output = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height:format=duration",
+            "-of", "json",
+            source_path,
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    info = json.loads(output)
+    stream = info["streams"][0]
+    duration = info.get("format", {}).get("duration")
+    return int(stream["width"]), int(stream["height"]), float(duration) if duration else None
+
+
+def _filter_value(value: str) -> str:
+    """
+    Quote a free-form option value for an ffmpeg filter graph.
+
+    Two levels parse it: the filter's option string (single quotes, inside
+    which only ' is special) and then the graph itself (where \\ ' [ ] , ;
+    are special), so it is quoted for the first and escaped for the second.
+    """
+    quoted = "'" + value.replace("'", "'\\''") + "'"
+    return "".join("\\" + c if c in "\\'[],;" else c for c in quoted)
+
+
+def _video_filter(spec: Dict[str, Any], watermark: Dict[str, Any]) -> Tuple[list, str]:
+    """Build ffmpeg extra inputs and the filter graph for one variant"""
+    max_width, max_height = spec["size"]
+    # Keep aspect ratio and even dimensions (required by libx264)
+    scale = (
+        f"scale={max_width}:{max_height}:force_original_aspect_ratio=decrease,"
+        "scale=trunc(iw/2)*2:trunc(ih/2)*2"
+    )
+    kind = watermark_kind(watermark)
+
+    if kind == "logo":
+        # Fit the logo within a fifth of the frame without upscaling, like the image
+        # thumbnail. In scale2ref iw/ih are the frame and main_w/main_h the logo.
+        fit = "min(1,min(iw/5/main_w,ih/5/main_h))"
+        return (
+            ["-i", watermark["image_path"]],
+            f"[0:v]{scale}[base];"
+            f"[1:v][base]scale2ref=w='trunc(main_w*{fit})':h='trunc(main_h*{fit})'[logo][frame];"
+            "[frame][logo]overlay=W-w-20:H-h-20[out]",
+        )
+
+    if kind == "text":
+        font_path = watermark.get("font_path") or DEFAULT_FONT_PATH
+        # expansion=none: a % in the text is not a drawtext function call
+        return (
+            [],
+            f"[0:v]{scale},drawtext=fontfile={_filter_value(font_path)}:"
+            f"text={_filter_value(watermark['text'])}:expansion=none:"
+            f"fontcolor=white@{watermark.get('opacity', 0.6)}:fontsize=h/30:"
+            "x=w-tw-20:y=h-th-20[out]",
+        )
+
+    return [], f"[0:v]{scale}[out]"
+
+
+def process_video(asset: Dict[str, Any], source_path: str, output_dir: str,
+                  watermark: Dict[str, Any], stages: Dict[str, float]) -> Dict[str, Any]:
+    """Generate platform variants of a video by streaming it through ffmpeg"""
+    started = time.perf_counter()
+    width, height, duration = probe_video(source_path)
+    _timed(stages, "probe", started)
+
+    variants = {}
+    for platform, spec in PLATFORM_VARIANTS.items():
+        output_path = os.path.join(output_dir, f"{asset['id']}_{platform}.mp4")
+        extra_inputs, filter_graph = _video_filter(spec, watermark)
+
+        # ffmpeg reads the source in chunks, so large videos are never held in memory
+        started = time.perf_counter()
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-v", "error",
+                "-i", source_path,
+                *extra_inputs,
+                "-filter_complex", filter_graph,
+                "-map", "[out]", "-map", "0:a?",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", str(spec["video_crf"]),
+                "-c:a", "aac", "-b:a", "128k",
+                "-threads", "1",
+                "-movflags", "+faststart",
+                output_path,
+            ],
+            capture_output=True,
+            check=True,
+        )
+        _timed(stages, "transcode", started)
+
+        variant_width, variant_height, _ = probe_video(output_path)
+        variants[platform] = {
+            "path": output_path,
+            "width": variant_width,
+            "height": variant_height,
+            "file_size_bytes": os.path.getsize(output_path),
+        }
+
+    return {
+        "width": width,
+        "height": height,
+        "duration_seconds": int(round(duration)) if duration else None,
+        "variants": variants,
+    }
+
+
+def process_asset(asset: Dict[str, Any], media_root: str, output_dir: str,
+                  watermark: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process a single media asset. Runs in a worker process.
+
+    Returns a result dict with dimensions, variants and per-stage timings.
+    Errors are captured in the result so one bad file never stops the batch.
+    """
+    stages: Dict[str, float] = {}
+    source_path = asset["file_path"]
+    if not os.path.isabs(source_path):
+        source_path = os.path.join(media_root, source_path)
+
+    result = {"id": asset["id"], "stages": stages, "bytes_in": 0}
+
+    try:
+        result["bytes_in"] = os.path.getsize(source_path)
+        os.makedirs(output_dir, exist_ok=True)
+
+        mime_type = asset.get("mime_type") or ""
+        if asset.get("media_type") == "video" or mime_type.startswith("video/"):
+            processed = process_video(asset, source_path, output_dir, watermark, stages)
+        else:
+            processed = process_image(asset, source_path, output_dir, watermark, stages)
+
+        result.update(processed)
+        result["watermarked"] = watermark_kind(watermark) is not None
+        result["bytes_out"] = sum(v["file_size_bytes"] for v in processed["variants"].values())
+
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else e.stderr
+        result["error"] = f"ffmpeg failed: {(stderr or '').strip()[-500:]}"
+    except Exception as e:
+        result["error"] = str(e)
+
+    return result
@@ -0,0 +1,283 @@
+"""
+MCP Server for Media Processing
+Picks up unprocessed media assets and generates watermarked, platform-ready variants
+"""
+
+import os
+import json
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from fastmcp import FastMCP
+
+from pipeline import PLATFORM_VARIANTS, process_asset
+from shared.cache import cache_get, cache_set
+from shared.db import get_db_connection
+from shared.metrics import instrument_tool
+from shared.serve import run_server
+
+# Initialize MCP server
+mcp = FastMCP("Media Processor")
+
+# Environment variables
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "/media")
+MEDIA_OUTPUT_DIR = os.getenv("MEDIA_OUTPUT_DIR", "/media/processed")
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", str(os.cpu_count() or 2)))
+# Compose passes WATERMARK_TEXT as an empty string when unset, so fall back on any empty value
+WATERMARK_TEXT = os.getenv("WATERMARK_TEXT") or os.getenv("BUSINESS_NAME", "")
+WATERMARK_IMAGE = os.getenv("WATERMARK_IMAGE")
+WATERMARK_FONT = os.getenv("WATERMARK_FONT")
+
+# Failed assets are retried on later runs until they have failed this many times
+MEDIA_MAX_ATTEMPTS = int(os.getenv("MEDIA_MAX_ATTEMPTS", "3"))
+
+# Claims older than this are considered abandoned (e.g. the worker crashed)
+CLAIM_TIMEOUT_MINUTES = 60
+
+STATS_CACHE_KEY = "media_pipeline:last_run"
+
+
+async def claim_unprocessed_assets(limit: int) -> List[Dict[str, Any]]:
+    """
+    Claim a batch of unprocessed assets.
+
+    SKIP LOCKED plus a claim timestamp lets several processor instances
+    share the backlog without picking up the same asset twice. Assets that
+    failed MEDIA_MAX_ATTEMPTS times are left alone, so broken files cannot
+    fill every batch.
+    """
+    async with get_db_connection() as conn:
+        assets = await conn.fetch("""
+            UPDATE media_assets
+            SET metadata = COALESCE(metadata, '{}'::jsonb)
+                || jsonb_build_object('processing_claimed_at', CURRENT_TIMESTAMP)
+            WHERE id IN (
+                SELECT id FROM media_assets
+                WHERE processed = false
+                AND (
+                    metadata IS NULL
+                    OR NOT metadata ? 'processing_claimed_at'
+                    OR (metadata->>'processing_claimed_at')::timestamp
+                        < CURRENT_TIMESTAMP - make_interval(mins => $1)
+                )
+                AND COALESCE((metadata->>'processing_attempts')::int, 0) < $3
+                ORDER BY uploaded_at
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id::text, file_name, file_path, media_type, mime_type
+        """, CLAIM_TIMEOUT_MINUTES, limit, MEDIA_MAX_ATTEMPTS)
+
+    return [dict(asset) for asset in assets]
+
+
+async def record_results(results: List[Dict[str, Any]]):
+    """Write dimensions, sizes and variant metadata back to media_assets"""
+    succeeded = [r for r in results if "error" not in r]
+    failed = [r for r in results if "error" in r]
+
+    async with get_db_connection() as conn:
+        if succeeded:
+            await conn.executemany("""
+                UPDATE media_assets SET
+                    width = $1,
+                    height = $2,
+                    duration_seconds = $3,
+                    file_size_bytes = $4,
+                    processed = true,
+                    watermarked = $5,
+                    optimized = true,
+                    metadata = (COALESCE(metadata, '{}'::jsonb)
+                        - 'processing_claimed_at' - 'processing_error' - 'processing_attempts')
+                        || jsonb_build_object('variants', $6::jsonb, 'processed_at', CURRENT_TIMESTAMP)
+                WHERE id = $7::uuid
+            """, [
+                (
+                    r["width"],
+                    r["height"],
+                    r["duration_seconds"],
+                    r["bytes_in"],
+                    r["watermarked"],
+                    json.dumps(r["variants"]),
+                    r["id"]
+                )
+                for r in succeeded
+            ])
+
+        # Release failed claims so they are retried, and keep the error for inspection
+        if failed:
+            await conn.executemany("""
+                UPDATE media_assets SET
+                    metadata = (COALESCE(metadata, '{}'::jsonb) - 'processing_claimed_at')
+                        || jsonb_build_object(
+                            'processing_error', $1::text,
+                            'processing_attempts', COALESCE((metadata->>'processing_attempts')::int, 0) + 1
+                        )
+                WHERE id = $2::uuid
+            """, [(r["error"], r["id"]) for r in failed])
+
+
+def summarize_throughput(results: List[Dict[str, Any]], wall_seconds: float,
+                         db_seconds: float, workers: int) -> Dict[str, Any]:
+    """Aggregate per-stage timings into throughput figures for worker sizing"""
+    stage_totals: Dict[str, float] = {}
+    for result in results:
+        for stage, seconds in result["stages"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+    stage_totals["database"] = db_seconds
+
+    completed = [r for r in results if "error" not in r]
+    variants = sum(len(r["variants"]) for r in completed)
+    bytes_in = sum(r["bytes_in"] for r in completed)
+    bytes_out = sum(r["bytes_out"] for r in completed)
+    busy_seconds = sum(seconds for stage, seconds in stage_totals.items() if stage != "database")
+
+    stages = {}
+    for stage, seconds in stage_totals.items():
+        stages[stage] = {
+            "total_seconds": round(seconds, 3),
+            "share_of_busy_time": round(seconds / busy_seconds, 3) if busy_seconds and stage != "database" else None,
+            "assets_per_second": round(len(completed) / seconds, 2) if seconds else None,
+        }
+
+    return {
+        "workers": workers,
+        "assets_processed": len(completed),
+        "assets_failed": len(results) - len(completed),
+        "variants_generated": variants,
+        "wall_seconds": round(wall_seconds, 3),
+        "assets_per_second": round(len(completed) / wall_seconds, 2) if wall_seconds else None,
+        "input_mb_per_second": round(bytes_in / 1_000_000 / wall_seconds, 2) if wall_seconds else None,
+        "compression_ratio": round(bytes_out / bytes_in, 3) if bytes_in else None,
+        # Busy time divided by wall time across all workers: close to 1.0 means the pool is saturated
+        "worker_utilization": round(busy_seconds / (wall_seconds * workers), 3) if wall_seconds else None,
+        "stages": stages,
+    }
+
+
+@mcp.tool()
+@instrument_tool
+async def process_media_assets(limit: int = 20, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Process unprocessed media assets into platform-ready variants.
+
+    Each asset is resized for every platform (Instagram feed/story, Facebook, TikTok),
+    watermarked and compressed in a pool of worker processes. Dimensions, file sizes
+    and variant paths are recorded back to the media_assets table.
+
+    Args:
+        limit: Maximum number of assets to process in this batch (default: 20)
+        workers: Number of worker processes (default: MEDIA_WORKERS or CPU count)
+
+    Returns:
+        Per-asset results and per-stage throughput statistics
+    """
+    try:
+        workers = max(1, workers or MEDIA_WORKERS)
+        started = time.perf_counter()
+
+        assets = await claim_unprocessed_assets(limit)
+        db_seconds = time.perf_counter() - started
+
+        if not assets:
+            return {"message": "No unprocessed media assets.", "assets_processed": 0}
+
+        watermark = {
+            "text": WATERMARK_TEXT,
+            "image_path": WATERMARK_IMAGE,
+            "font_path": WATERMARK_FONT,
+        }
+
+        # CPU-bound work runs in worker processes; the event loop stays free for other tool calls.
+        # Spawned, not forked: a fork would copy the running loop, the DB pool and exporter threads.
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=min(workers, len(assets)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = await asyncio.gather(*[
+                loop.run_in_executor(pool, process_asset, asset, MEDIA_ROOT, MEDIA_OUTPUT_DIR, watermark)
+                for asset in assets
+            ])
+
+        db_started = time.perf_counter()
+        await record_results(results)
+        db_seconds += time.perf_counter() - db_started
+
+        stats = summarize_throughput(results, time.perf_counter() - started, db_seconds, workers)
+        stats["completed_at"] = datetime.now().isoformat()
+
+        # Keep the last run around for get_media_pipeline_stats
+        await cache_set(STATS_CACHE_KEY, json.dumps(stats), 7 * 86400)
+
+        return {
+            "throughput": stats,
+            "assets": [
+                {
+                    "id": r["id"],
+                    "error": r["error"],
+                } if "error" in r else {
+                    "id": r["id"],
+                    "width": r["width"],
+                    "height": r["height"],
+                    "file_size_bytes": r["bytes_in"],
+                    "variants": r["variants"],
+                }
+                for r in results
+            ]
+        }
+
+    except Exception as e:
+        return {"error": f"Failed to process media assets: {str(e)}"}
+
+
+@mcp.tool()
+@instrument_tool
+async def get_media_pipeline_stats() -> Dict[str, Any]:
+    """
+    Get the media processing backlog and throughput of the last pipeline run.
+
+    Returns:
+        Pending/processed asset counts and per-stage throughput from the last run
+    """
+    try:
+        async with get_db_connection() as conn:
+            backlog = await conn.fetchrow("""
+                SELECT
+                    COUNT(*) FILTER (WHERE processed = false) as pending,
+                    COUNT(*) FILTER (WHERE processed = true) as processed,
+                    COUNT(*) FILTER (WHERE metadata ? 'processing_error') as failed,
+                    COUNT(*) FILTER (
+                        WHERE processed = false
+                        AND COALESCE((metadata->>'processing_attempts')::int, 0) >= $1
+                    ) as given_up,
+                    COALESCE(SUM(file_size_bytes) FILTER (WHERE processed = false), 0) as pending_bytes
+                FROM media_assets
+            """, MEDIA_MAX_ATTEMPTS)
+
+        cached = await cache_get(STATS_CACHE_KEY)
+
+        return {
+            "backlog": {
+                "pending": int(backlog["pending"]),
+                "processed": int(backlog["processed"]),
+                "failed": int(backlog["failed"]),
+                # Failed MEDIA_MAX_ATTEMPTS times; clear metadata.processing_attempts to retry
+                "given_up": int(backlog["given_up"]),
+                "pending_bytes": int(backlog["pending_bytes"]),
+            },
+            "platform_variants": {
+                platform: f"{spec['size'][0]}x{spec['size'][1]}"
+                for platform, spec in PLATFORM_VARIANTS.items()
+            },
+            "last_run": json.loads(cached) if cached else None
+        }
+
+    except Exception as e:
+        return {"error": f"Failed to get pipeline stats: {str(e)}"}
+
+
+if __name__ == "__main__":
+    # Run the MCP server (stdio by default, --transport http for network mode)
+    run_server(mcp)
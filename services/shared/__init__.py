@@ -0,0 +1,4 @@
+"""
+Shared core for the MCP servers
+Graph API client, database pool and Redis cache used by every platform server
+"""
@@ -0,0 +1,45 @@
+"""
+Redis cache helpers shared by the MCP servers
+"""
+
+import os
+import sys
+from typing import Optional
+import redis.asyncio as redis
+
+from shared.metrics import downstream_span, record_cache_lookup
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# One client (and connection pool) per process
+redis_client = redis.from_url(REDIS_URL) if REDIS_URL else None
+
+
+async def cache_get(key: str) -> Optional[str]:
+    """Get cached value from Redis"""
+    if redis_client:
+        try:
+            async with downstream_span("redis", "get"):
+                value = await redis_client.get(key)
+            record_cache_lookup(key, value is not None)
+            return value
+        except Exception as e:
+            # stderr: stdout carries the MCP protocol in stdio mode
+            print(f"Redis get error: {e}", file=sys.stderr)
+    return None
+
+
+async def cache_set(key: str, value: str, expiry: int = 3600):
+    """Set cached value in Redis with expiry in seconds"""
+    if redis_client:
+        try:
+            async with downstream_span("redis", "setex"):
+                await redis_client.setex(key, expiry, value)
+        except Exception as e:
+            print(f"Redis set error: {e}", file=sys.stderr)
+
+
+async def close_cache():
+    """Close the Redis connection pool (on shutdown)"""
+    if redis_client:
+        await redis_client.aclose()
@@ -0,0 +1,89 @@
+"""
+PostgreSQL helpers shared by the MCP servers
+A single asyncpg connection pool per process plus bulk upsert and account lookup helpers
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional, Sequence
+import asyncpg
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+_query_observers: List[Callable] = []
+
+
+def add_query_observer(observer: Callable):
+    """
+    Call `observer(record)` for every query run on pooled connections.
+
+    `record` is an asyncpg LoggedQuery (query, args, elapsed, exception).
+    Register before the pool is first used.
+    """
+    _query_observers.append(observer)
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Attach registered query observers to a new pooled connection"""
+    for observer in _query_observers:
+        conn.add_query_logger(observer)
+
+
+async def get_pool() -> asyncpg.Pool:
+    """Create the connection pool on first use"""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await asyncpg.create_pool(
+                    DATABASE_URL, min_size=DB_POOL_MIN, max_size=DB_POOL_MAX, init=_init_connection
+                )
+    return _pool
+
+
+async def close_pool():
+    """Close the connection pool (on shutdown)"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def get_db_connection():
+    """
+    Borrow a pooled database connection inside a transaction.
+
+    Commits on success, rolls back on error and always returns
+    the connection to the pool.
+    """
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            yield conn
+
+
+async def bulk_upsert(conn: asyncpg.Connection, sql: str, rows: Sequence[Sequence]):
+    """
+    Insert many rows in a single pipelined round trip.
+
+    `sql` is a single-row statement with $n placeholders, e.g.
+    "INSERT INTO t (a, b) VALUES ($1, $2) ON CONFLICT (a) DO UPDATE SET b = EXCLUDED.b".
+    """
+    if rows:
+        await conn.executemany(sql, rows)
+
+
+async def ensure_social_account(conn: asyncpg.Connection, platform: str, account_id: str):
+    """Get or create a social_accounts row and return its UUID"""
+    return await conn.fetchval("""
+        INSERT INTO social_accounts (platform, account_id, is_active)
+        VALUES ($1, $2, true)
+        ON CONFLICT (platform, account_id) DO UPDATE SET updated_at = social_accounts.updated_at
+        RETURNING id
+    """, platform, account_id)
@@ -0,0 +1,141 @@
+"""
+Facebook Graph API client shared by the Instagram and Facebook servers
+"""
+
+import os
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Tuple
+import httpx
+
+from shared.metrics import downstream_span
+from shared.quota import (
+    GRAPH_QUOTA_MAX_WAIT, acquire_graph_quota, block_graph_scope, record_graph_usage, throttle_delay
+)
+
+META_ACCESS_TOKEN = os.getenv("META_ACCESS_TOKEN")
+
+# Graph API base URL
+GRAPH_API_URL = os.getenv("GRAPH_API_URL", "https://graph.facebook.com/v18.0")
+GRAPH_API_TIMEOUT = float(os.getenv("GRAPH_API_TIMEOUT", "30"))
+
+# Reuse TCP/TLS connections across calls instead of reconnecting per request
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Create the shared HTTP client on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=GRAPH_API_TIMEOUT,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (on shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def graph_operation(url: str) -> str:
+    """Metric label for a Graph URL: the edge name ("insights", "media"), or "node" for ids"""
+    path = httpx.URL(url).path.strip("/").split("/")
+    # /v18.0/{id} -> node, /v18.0/{id}/{edge} -> edge
+    return path[2] if len(path) > 2 else "node"
+
+
+def graph_node(url: str) -> str:
+    """The object a Graph URL addresses (account, page or media id)"""
+    path = httpx.URL(url).path.strip("/").split("/")
+    return path[1] if len(path) > 1 else path[0]
+
+
+async def make_graph_api_request(endpoint: str, params: Dict[str, Any],
+                                 access_token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Make request to Facebook Graph API.
+
+    Waits for quota from the shared scheduler (shared/quota.py) first, and on
+    a throttling error waits and retries until GRAPH_QUOTA_MAX_WAIT runs out.
+    """
+    params = dict(params)
+    params["access_token"] = access_token or META_ACCESS_TOKEN
+    url = endpoint if endpoint.startswith("http") else f"{GRAPH_API_URL}/{endpoint}"
+    node = graph_node(url)
+    operation = graph_operation(url)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + GRAPH_QUOTA_MAX_WAIT
+
+    attempt = 0
+    while True:
+        await acquire_graph_quota(node, deadline)
+        async with downstream_span("graph", operation):
+            response = await get_http_client().get(url, params=params)
+        await record_graph_usage(node, response.headers)
+
+        if response.is_error:
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            delay = throttle_delay(response.status_code, body, response.headers, attempt)
+            if delay is not None and loop.time() + delay < deadline:
+                # Pause the buckets for every caller, then queue behind them
+                await block_graph_scope(node, delay)
+                attempt += 1
+                continue
+            response.raise_for_status()
+
+        return response.json()
+
+
+async def paginate(endpoint: str, params: Dict[str, Any], max_items: int,
+                   access_token: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Collect up to `max_items` results from a paged Graph API edge.
+
+    Follows the cursor in `paging.next` until enough items are collected
+    or the edge is exhausted.
+    """
+    items: List[Dict[str, Any]] = []
+    params = dict(params)
+    params.setdefault("limit", min(max_items, 100))
+
+    data = await make_graph_api_request(endpoint, params, access_token)
+    while True:
+        items.extend(data.get("data", []))
+        next_cursor = data.get("paging", {}).get("cursors", {}).get("after")
+        if len(items) >= max_items or not data.get("paging", {}).get("next") or not next_cursor:
+            break
+        params["after"] = next_cursor
+        data = await make_graph_api_request(endpoint, params, access_token)
+
+    return items[:max_items]
+
+
+def parse_graph_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Graph API timestamp ("2024-05-01T18:30:00+0000") into naive UTC"""
+    if not value:
+        return None
+    parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def resolve_date_range(date_range: str) -> Optional[Tuple[date, date]]:
+    """Translate a named date range into (start_date, end_date); None if unknown"""
+    today = datetime.now().date()
+
+    if date_range == "today":
+        return today, today
+    elif date_range == "yesterday":
+        return today - timedelta(days=1), today - timedelta(days=1)
+    elif date_range == "last_7_days":
+        return today - timedelta(days=7), today - timedelta(days=1)
+    elif date_range == "last_30_days":
+        return today - timedelta(days=30), today - timedelta(days=1)
+    return None
@@ -0,0 +1,236 @@
+"""
+Instrumentation shared by the MCP servers
+Prometheus metrics for every tool call and downstream call (Postgres, Redis,
+Graph API, Anthropic), token usage and cache hit ratios, plus optional
+OpenTelemetry tracing.
+
+    @mcp.tool()
+    @instrument_tool
+    async def my_tool(...): ...
+
+    async with downstream_span("graph", "insights"):
+        ...
+
+Metrics are served on /metrics in HTTP mode, or on METRICS_PORT in stdio mode.
+With several workers, set PROMETHEUS_MULTIPROC_DIR to an empty directory so
+/metrics aggregates all of them.
+
+Tracing is enabled when OTEL_EXPORTER_OTLP_ENDPOINT is set and the
+opentelemetry-sdk and opentelemetry-exporter-otlp packages are installed;
+spans are named after OTEL_SERVICE_NAME.
+"""
+
+import os
+import sys
+import time
+import functools
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    start_http_server
+)
+from prometheus_client import multiprocess
+
+from shared.db import add_query_observer
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "mcp-server")
+
+# Tool calls span milliseconds (cache hits) to tens of seconds (LLM, media)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+TOOL_CALLS = Counter(
+    "mcp_tool_calls_total", "MCP tool calls by outcome (ok, error result, exception)",
+    ["tool", "status"]
+)
+TOOL_DURATION = Histogram(
+    "mcp_tool_duration_seconds", "MCP tool call duration", ["tool"], buckets=LATENCY_BUCKETS
+)
+TOOLS_IN_FLIGHT = Gauge(
+    "mcp_tools_in_flight", "MCP tool calls currently running", ["tool"], multiprocess_mode="livesum"
+)
+DOWNSTREAM_CALLS = Counter(
+    "mcp_downstream_calls_total", "Calls to Postgres, Redis, the Graph API and Anthropic",
+    ["system", "operation", "status"]
+)
+DOWNSTREAM_DURATION = Histogram(
+    "mcp_downstream_duration_seconds", "Downstream call duration", ["system", "operation"],
+    buckets=LATENCY_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    "mcp_cache_requests_total", "Redis cache lookups by key prefix; hit ratio = hit / (hit + miss)",
+    ["cache", "result"]
+)
+LLM_TOKENS = Counter(
+    "mcp_llm_tokens_total", "Tokens used per generation", ["model", "kind"]
+)
+LLM_GENERATIONS = Counter(
+    "mcp_llm_generations_total", "LLM generations", ["model"]
+)
+GRAPH_QUOTA_WAIT = Histogram(
+    "mcp_graph_quota_wait_seconds", "Time Graph calls spent queued for quota", ["priority"],
+    buckets=(0, 0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+GRAPH_USAGE = Gauge(
+    "mcp_graph_usage_percent", "Latest usage reported by Meta (X-App-Usage, X-Business-Use-Case-Usage)",
+    ["scope"], multiprocess_mode="max"
+)
+GRAPH_THROTTLED = Counter(
+    "mcp_graph_throttled_total", "Graph responses rejected with a throttling error"
+)
+
+
+def _init_tracer():
+    """OpenTelemetry tracer, or None when not configured or not installed"""
+    if not OTEL_EXPORTER_OTLP_ENDPOINT:
+        return None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        print("OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry is not installed; tracing disabled",
+              file=sys.stderr)
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    # Endpoint, headers and protocol details come from the standard OTEL_* variables
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    return trace.get_tracer("hospitality-marketing-mcp")
+
+
+tracer = _init_tracer()
+
+
+@asynccontextmanager
+async def _span(name: str, attributes: dict):
+    """OpenTelemetry span around the block; no-op without a tracer"""
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+@asynccontextmanager
+async def downstream_span(system: str, operation: str):
+    """
+    Time one downstream call.
+
+    `system` is postgres, redis, graph or anthropic; `operation` must be
+    low-cardinality (an edge or command name, never an id).
+    """
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        async with _span(f"{system} {operation}", {"peer.service": system, "operation": operation}):
+            yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        DOWNSTREAM_DURATION.labels(system, operation).observe(time.perf_counter() - started)
+        DOWNSTREAM_CALLS.labels(system, operation, status).inc()
+
+
+def instrument_tool(fn):
+    """
+    Record duration, outcome and a span for an MCP tool.
+
+    Goes below @mcp.tool() so FastMCP registers the wrapper; functools.wraps
+    keeps the signature and docstring FastMCP builds the schema from. Tools
+    report failures as {"error": ...} results, which count as status "error".
+    """
+    tool = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        status = "ok"
+        TOOLS_IN_FLIGHT.labels(tool).inc()
+        try:
+            async with _span(f"tool {tool}", {"mcp.tool": tool}) as span:
+                result = await fn(*args, **kwargs)
+                if isinstance(result, dict) and "error" in result:
+                    status = "error"
+                    if span is not None:
+                        span.set_attribute("error.message", str(result["error"]))
+                return result
+        except BaseException:
+            status = "exception"
+            raise
+        finally:
+            TOOLS_IN_FLIGHT.labels(tool).dec()
+            TOOL_DURATION.labels(tool).observe(time.perf_counter() - started)
+            TOOL_CALLS.labels(tool, status).inc()
+
+    return wrapper
+
+
+def record_cache_lookup(key: str, hit: bool):
+    """Count a cache hit or miss under the key's prefix (text before the first colon)"""
+    CACHE_REQUESTS.labels(key.split(":", 1)[0], "hit" if hit else "miss").inc()
+
+
+def record_token_usage(model: str, usage: Any):
+    """Count input/output tokens from an Anthropic response's `usage`"""
+    LLM_GENERATIONS.labels(model).inc()
+    if usage is None:
+        return
+    for kind in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+        count = getattr(usage, kind, None)
+        if count:
+            LLM_TOKENS.labels(model, kind.replace("_tokens", "")).inc(count)
+
+
+def _sql_operation(query: str) -> str:
+    """Leading SQL keyword (SELECT, INSERT, WITH, ...) as the operation label"""
+    words = query.split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def _observe_query(record):
+    """asyncpg query logger: one downstream sample (and span) per statement"""
+    operation = _sql_operation(record.query)
+    status = "error" if record.exception is not None else "ok"
+    DOWNSTREAM_DURATION.labels("postgres", operation).observe(record.elapsed)
+    DOWNSTREAM_CALLS.labels("postgres", operation, status).inc()
+
+    if tracer is not None:
+        # The logger runs after the statement, so back-date the span by its duration
+        end = time.time_ns()
+        span = tracer.start_span(
+            f"postgres {operation}",
+            start_time=end - int(record.elapsed * 1e9),
+            attributes={"peer.service": "postgres", "db.system": "postgresql", "db.statement": record.query[:500]}
+        )
+        span.end(end_time=end)
+
+
+add_query_observer(_observe_query)
+
+
+def render_metrics() -> tuple:
+    """Prometheus exposition (body, content type), aggregated across workers if multiprocess"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: Optional[int] = None):
+    """Serve /metrics on its own port (stdio mode, which has no HTTP app)"""
+    port = port or METRICS_PORT
+    if not port:
+        return
+    try:
+        start_http_server(port)
+    except OSError as e:
+        # Another stdio session in the same container already serves the port
+        print(f"Metrics server not started on port {port}: {e}", file=sys.stderr)
@@ -0,0 +1,253 @@
+"""
+Distributed Graph API quota scheduler
+Every Graph call takes a token from two Redis token buckets shared by all
+servers and workers: one for the app and one for the account (page or
+Instagram business account) being called. Near the limit callers wait in line
+instead of failing.
+
+Buckets adapt to what Meta reports: X-App-Usage slows the app bucket and
+X-Business-Use-Case-Usage slows the account bucket as usage climbs past
+GRAPH_QUOTA_SLOW_AT percent, and pause it for estimated_time_to_regain_access.
+
+Tool calls run at "interactive" priority. Background work (syncs, snapshots)
+runs inside `background_priority()` and may only use the part of a bucket
+above GRAPH_QUOTA_BACKGROUND_RESERVE, so interactive calls still get through
+when the budget is tight.
+"""
+
+import os
+import sys
+import json
+import random
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.cache import redis_client
+from shared.metrics import GRAPH_QUOTA_WAIT, GRAPH_THROTTLED, GRAPH_USAGE
+
+# Sustained calls per second and burst size; a rate of 0 disables the bucket
+GRAPH_QUOTA_APP_RATE = float(os.getenv("GRAPH_QUOTA_APP_RATE", "5"))
+GRAPH_QUOTA_APP_BURST = float(os.getenv("GRAPH_QUOTA_APP_BURST", "50"))
+GRAPH_QUOTA_ACCOUNT_RATE = float(os.getenv("GRAPH_QUOTA_ACCOUNT_RATE", "1"))
+GRAPH_QUOTA_ACCOUNT_BURST = float(os.getenv("GRAPH_QUOTA_ACCOUNT_BURST", "20"))
+# Share of each bucket kept for interactive calls
+GRAPH_QUOTA_BACKGROUND_RESERVE = min(float(os.getenv("GRAPH_QUOTA_BACKGROUND_RESERVE", "0.3")), 0.9)
+# Reported usage (percent) at which the bucket starts slowing down
+GRAPH_QUOTA_SLOW_AT = float(os.getenv("GRAPH_QUOTA_SLOW_AT", "50"))
+# Longest a call waits in line before giving up
+GRAPH_QUOTA_MAX_WAIT = float(os.getenv("GRAPH_QUOTA_MAX_WAIT", "120"))
+
+BUCKET_TTL = 3600
+# Graph error codes for app, user, page and business use case throttling
+THROTTLE_CODES = {4, 17, 32, 613, 80001, 80002, 80004, 80005, 80006, 80008}
+
+graph_priority: ContextVar[str] = ContextVar("graph_priority", default="interactive")
+
+# Take one token from every bucket, or none and return the wait in seconds.
+# KEYS: bucket hashes. ARGV[1]: share of each bucket that must stay untouched
+# (background reserve), then rate and burst per key.
+ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local reserve = tonumber(ARGV[1])
+local wait = 0
+local tokens = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local b = redis.call('HMGET', key, 'tokens', 'ts', 'factor', 'blocked_until')
+    local effective = rate * (tonumber(b[3]) or 1)
+    local blocked_until = tonumber(b[4]) or 0
+    local level = tonumber(b[1]) or burst
+    local ts = tonumber(b[2]) or now
+    level = math.min(burst, level + math.max(0, now - ts) * effective)
+    tokens[i] = level
+    local needed = 1 + reserve * burst
+    if blocked_until > now then
+        wait = math.max(wait, blocked_until - now)
+    elseif level < needed then
+        wait = math.max(wait, (needed - level) / effective)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local level = tokens[i]
+    if wait == 0 then level = level - 1 end
+    redis.call('HSET', key, 'tokens', level, 'ts', now)
+    redis.call('EXPIRE', key, tonumber(ARGV[#ARGV]))
+end
+return tostring(wait)
+"""
+
+# Set a bucket's rate factor (unless ARGV[1] is empty) and optionally pause it for ARGV[2] seconds
+ADAPT_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+if ARGV[1] ~= '' then
+    redis.call('HSET', KEYS[1], 'factor', ARGV[1])
+end
+local block = tonumber(ARGV[2])
+if block > 0 then
+    local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+    redis.call('HSET', KEYS[1], 'blocked_until', math.max(current, now + block))
+end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return 1
+"""
+
+_acquire = redis_client.register_script(ACQUIRE_SCRIPT) if redis_client else None
+_adapt = redis_client.register_script(ADAPT_SCRIPT) if redis_client else None
+
+
+class GraphQuotaTimeout(Exception):
+    """A Graph call waited GRAPH_QUOTA_MAX_WAIT seconds without getting quota"""
+
+
+@contextmanager
+def background_priority():
+    """Run the enclosed Graph calls at background priority"""
+    token = graph_priority.set("background")
+    try:
+        yield
+    finally:
+        graph_priority.reset(token)
+
+
+def _buckets(node: str) -> List[Tuple[str, float, float]]:
+    """(key, rate, burst) for the enabled buckets a call to `node` draws from"""
+    buckets = []
+    if GRAPH_QUOTA_APP_RATE > 0:
+        buckets.append(("graph_quota:app", GRAPH_QUOTA_APP_RATE, GRAPH_QUOTA_APP_BURST))
+    if GRAPH_QUOTA_ACCOUNT_RATE > 0:
+        buckets.append((f"graph_quota:account:{node}", GRAPH_QUOTA_ACCOUNT_RATE, GRAPH_QUOTA_ACCOUNT_BURST))
+    return buckets
+
+
+async def acquire_graph_quota(node: str, deadline: float):
+    """
+    Wait until the app and account buckets allow one more call.
+
+    `deadline` is an event-loop time; raises GraphQuotaTimeout past it.
+    Fails open (no waiting) when Redis is unavailable.
+    """
+    buckets = _buckets(node)
+    if not _acquire or not buckets:
+        return
+
+    loop = asyncio.get_running_loop()
+    priority = graph_priority.get()
+    reserve = GRAPH_QUOTA_BACKGROUND_RESERVE if priority == "background" else 0
+    keys = [key for key, _, _ in buckets]
+    args = [reserve]
+    for _, rate, burst in buckets:
+        args.extend([rate, burst])
+    args.append(BUCKET_TTL)
+
+    started = loop.time()
+    while True:
+        try:
+            wait = float(await _acquire(keys=keys, args=args))
+        except Exception as e:
+            print(f"Graph quota unavailable, not throttling: {e}", file=sys.stderr)
+            return
+        if wait <= 0:
+            GRAPH_QUOTA_WAIT.labels(priority).observe(loop.time() - started)
+            return
+        if loop.time() + wait > deadline:
+            raise GraphQuotaTimeout(f"Graph API quota exhausted; no capacity within {GRAPH_QUOTA_MAX_WAIT:.0f}s")
+        # Jitter so queued callers across processes do not all retry at once
+        await asyncio.sleep(wait + random.uniform(0, min(wait, 1.0) * 0.2))
+
+
+def parse_usage(headers: Any) -> Tuple[Optional[float], Optional[float], float]:
+    """
+    Read Meta's usage headers.
+
+    Returns (app usage %, business use case usage %, seconds until access
+    is regained); usages are None when the header is missing.
+    """
+    app_usage = None
+    business_usage = None
+    regain_seconds = 0.0
+
+    try:
+        raw = headers.get("x-app-usage")
+        if raw:
+            usage = json.loads(raw)
+            app_usage = max(float(usage.get(k, 0)) for k in ("call_count", "total_cputime", "total_time"))
+
+        raw = headers.get("x-business-use-case-usage")
+        if raw:
+            business_usage = 0.0
+            for entries in json.loads(raw).values():
+                for entry in entries:
+                    business_usage = max(
+                        business_usage,
+                        *(float(entry.get(k, 0)) for k in ("call_count", "total_cputime", "total_time"))
+                    )
+                    regain_seconds = max(regain_seconds, float(entry.get("estimated_time_to_regain_access", 0)) * 60)
+    except (ValueError, TypeError, AttributeError) as e:
+        print(f"Unreadable Graph usage header: {e}", file=sys.stderr)
+
+    return app_usage, business_usage, regain_seconds
+
+
+def rate_factor(usage: float) -> float:
+    """Full speed below GRAPH_QUOTA_SLOW_AT percent, then slowing linearly to 5% at the limit"""
+    if usage < GRAPH_QUOTA_SLOW_AT:
+        return 1.0
+    return max(0.05, (100 - usage) / max(100 - GRAPH_QUOTA_SLOW_AT, 1))
+
+
+async def _adapt_bucket(key: str, usage: Optional[float], block_seconds: float) -> bool:
+    """Slow a bucket to match `usage` (None keeps its speed) and pause it for `block_seconds`"""
+    if not _adapt:
+        return False
+    factor = "" if usage is None else rate_factor(usage)
+    try:
+        await _adapt(keys=[key], args=[factor, block_seconds, BUCKET_TTL])
+        return True
+    except Exception as e:
+        print(f"Graph quota update failed: {e}", file=sys.stderr)
+        return False
+
+
+async def record_graph_usage(node: str, headers: Any):
+    """Adapt the app and account buckets to the usage Meta reported on a response"""
+    app_usage, business_usage, regain_seconds = parse_usage(headers)
+
+    if app_usage is not None:
+        GRAPH_USAGE.labels("app").set(app_usage)
+        if GRAPH_QUOTA_APP_RATE > 0:
+            await _adapt_bucket("graph_quota:app", app_usage, 60 if app_usage >= 100 else 0)
+
+    if business_usage is not None:
+        GRAPH_USAGE.labels("business_use_case").set(business_usage)
+        if GRAPH_QUOTA_ACCOUNT_RATE > 0:
+            block = regain_seconds or (60 if business_usage >= 100 else 0)
+            await _adapt_bucket(f"graph_quota:account:{node}", business_usage, block)
+
+
+def throttle_delay(status_code: int, body: Dict[str, Any], headers: Any, attempt: int) -> Optional[float]:
+    """Seconds to back off if a response is a Graph throttling error, else None"""
+    if status_code not in (400, 403, 429):
+        return None
+    error = body.get("error", {}) if isinstance(body, dict) else {}
+    if status_code != 429 and error.get("code") not in THROTTLE_CODES:
+        return None
+
+    GRAPH_THROTTLED.inc()
+    _, _, regain_seconds = parse_usage(headers)
+    return regain_seconds or min(60.0, 2.0 ** attempt)
+
+
+async def block_graph_scope(node: str, seconds: float):
+    """
+    Pause the app and account buckets for every process after a throttling error.
+
+    Without the scheduler (Redis down or quotas disabled) just back off locally.
+    """
+    blocked = [await _adapt_bucket(key, None, seconds) for key, _, _ in _buckets(node)]
+    if not blocked or not all(blocked):
+        await asyncio.sleep(seconds)
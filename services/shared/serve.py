@@ -0,0 +1,245 @@
+"""
+Transport selection for the MCP servers
+Runs a server over stdio (Claude Desktop via docker exec) or as a network service
+over streamable HTTP / SSE with several worker processes.
+
+    python server.py                                  # stdio (default)
+    python server.py --transport http --workers 4     # streamable HTTP on MCP_HOST:MCP_PORT
+    python server.py --transport sse                  # legacy SSE transport
+
+HTTP mode exposes:
+    /mcp (or /sse)  MCP endpoint
+    /healthz        liveness - the process is up and serving requests
+    /readyz         readiness - Postgres and Redis are reachable and the worker is not draining
+    /metrics        Prometheus metrics (see shared/metrics.py)
+
+stdio mode serves the metrics on METRICS_PORT instead, when it is set.
+
+With several workers, streamable HTTP runs stateless (no Mcp-Session-Id), so
+any worker can answer any request. SSE keeps each session in the worker that
+opened it and is limited to one worker.
+
+On SIGTERM each worker keeps serving but reports not ready on /readyz, waits up
+to MCP_SHUTDOWN_TIMEOUT seconds for in-flight tool calls to finish, then lets
+uvicorn close the connections (MCP_CLOSE_TIMEOUT) and closes its database,
+Redis and HTTP pools. Stop grace periods must exceed the sum of both timeouts.
+"""
+
+import os
+import sys
+import signal
+import asyncio
+import argparse
+import importlib
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from shared.metrics import render_metrics, start_metrics_server
+
+MCP_HOST = os.getenv("MCP_HOST", "0.0.0.0")
+MCP_PORT = int(os.getenv("MCP_PORT", "8000"))
+MCP_WORKERS = int(os.getenv("MCP_WORKERS", "1"))
+MCP_SHUTDOWN_TIMEOUT = float(os.getenv("MCP_SHUTDOWN_TIMEOUT", "30"))
+# After draining: how long uvicorn waits for idle and streaming connections to close
+MCP_CLOSE_TIMEOUT = int(os.getenv("MCP_CLOSE_TIMEOUT", "5"))
+# Module holding the `mcp` instance, imported again by each worker process
+MCP_SERVER_MODULE = os.getenv("MCP_SERVER_MODULE", "server")
+
+# Transport name -> (fastmcp transport, endpoint path)
+TRANSPORTS = {
+    "http": ("streamable-http", "/mcp"),
+    "sse": ("sse", "/sse"),
+}
+
+
+class InFlightTracker(Middleware):
+    """Counts running tool calls so shutdown can wait for them"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._drain_task = None
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            return await call_next(context)
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop reporting ready and wait for in-flight calls; False if the timeout hit"""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def drain_on_sigterm(self):
+        """
+        Drain before uvicorn sees SIGTERM.
+
+        Uvicorn closes its listeners as soon as it handles the signal, so
+        /readyz could never report "draining" and tool calls would race its
+        graceful-shutdown timeout. Wrap its handler instead: drain while still
+        serving, then pass the signal on. A second SIGTERM passes it on at once.
+        Call from the running event loop (lifespan startup), after uvicorn has
+        installed its handlers.
+        """
+        loop = asyncio.get_running_loop()
+        uvicorn_handler = signal.getsignal(signal.SIGTERM)
+        if not callable(uvicorn_handler):
+            return
+
+        async def drain_then_exit(sig):
+            if not await self.drain(MCP_SHUTDOWN_TIMEOUT):
+                print(f"Shutdown timeout: {self.in_flight} tool call(s) still running", file=sys.stderr)
+            uvicorn_handler(sig, None)
+
+        def handle_sigterm(sig, frame):
+            if self.draining:
+                uvicorn_handler(sig, frame)
+                return
+            self.draining = True
+
+            def start_drain():
+                self._drain_task = loop.create_task(drain_then_exit(sig))
+
+            loop.call_soon_threadsafe(start_drain)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+
+async def check_dependencies() -> dict:
+    """Check Postgres and Redis reachability for readiness"""
+    from shared.cache import redis_client
+    from shared.db import DATABASE_URL, get_pool
+
+    checks = {}
+
+    if DATABASE_URL:
+        try:
+            pool = await get_pool()
+            await asyncio.wait_for(pool.fetchval("SELECT 1"), 2)
+            checks["postgres"] = "ok"
+        except Exception as e:
+            checks["postgres"] = f"error: {e}"
+
+    if redis_client:
+        try:
+            await asyncio.wait_for(redis_client.ping(), 2)
+            checks["redis"] = "ok"
+        except Exception as e:
+            checks["redis"] = f"error: {e}"
+
+    return checks
+
+
+async def close_resources():
+    """Close the shared pools"""
+    from shared.cache import close_cache
+    from shared.db import close_pool
+    from shared.graph import close_http_client
+
+    await close_pool()
+    await close_cache()
+    await close_http_client()
+
+
+def build_http_app(mcp, transport: str = "http", workers: int = 1) -> Starlette:
+    """Wrap a FastMCP server in an ASGI app with health endpoints and draining"""
+    fastmcp_transport, path = TRANSPORTS[transport]
+    tracker = InFlightTracker()
+    mcp.add_middleware(tracker)
+    if transport == "http" and workers > 1:
+        # Sessions live in one worker's memory, but requests land on any worker
+        mcp_app = mcp.http_app(path=path, transport=fastmcp_transport, stateless_http=True)
+    else:
+        mcp_app = mcp.http_app(path=path, transport=fastmcp_transport)
+
+    async def liveness(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "alive", "in_flight": tracker.in_flight})
+
+    async def readiness(request: Request) -> JSONResponse:
+        if tracker.draining:
+            return JSONResponse({"status": "draining", "in_flight": tracker.in_flight}, status_code=503)
+
+        checks = await check_dependencies()
+        ready = all(status == "ok" for status in checks.values())
+        return JSONResponse(
+            {"status": "ready" if ready else "unavailable", "checks": checks},
+            status_code=200 if ready else 503
+        )
+
+    async def metrics(request: Request) -> Response:
+        body, content_type = render_metrics()
+        return Response(body, media_type=content_type)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        tracker.drain_on_sigterm()
+        async with mcp_app.lifespan(app):
+            yield
+        await close_resources()
+
+    return Starlette(
+        routes=[
+            Route("/healthz", liveness, methods=["GET"]),
+            Route("/readyz", readiness, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+            Mount("/", app=mcp_app),
+        ],
+        lifespan=lifespan
+    )
+
+
+def create_app() -> Starlette:
+    """Uvicorn app factory - runs once in every worker process"""
+    server = importlib.import_module(MCP_SERVER_MODULE)
+    return build_http_app(server.mcp, os.getenv("MCP_TRANSPORT", "http"), int(os.getenv("MCP_WORKERS", "1")))
+
+
+def run_server(mcp):
+    """Run a server with the transport chosen on the command line"""
+    parser = argparse.ArgumentParser(description=f"{mcp.name} MCP server")
+    parser.add_argument("--transport", choices=["stdio", *TRANSPORTS], default="stdio")
+    parser.add_argument("--host", default=MCP_HOST)
+    parser.add_argument("--port", type=int, default=MCP_PORT)
+    parser.add_argument("--workers", type=int, default=MCP_WORKERS)
+    options = parser.parse_args()
+
+    if options.transport == "stdio":
+        start_metrics_server()
+        mcp.run()
+        return
+
+    if options.transport == "sse" and options.workers > 1:
+        # /sse and /messages arrive on separate connections, so they would hit different workers
+        parser.error("--transport sse keeps sessions in one worker; use --workers 1 (MCP_WORKERS=1) "
+                     "or --transport http")
+
+    import uvicorn
+
+    # Workers import the app factory by name, so pass the settings through the environment
+    os.environ["MCP_TRANSPORT"] = options.transport
+    os.environ["MCP_WORKERS"] = str(options.workers)
+    uvicorn.run(
+        "shared.serve:create_app",
+        factory=True,
+        host=options.host,
+        port=options.port,
+        workers=options.workers,
+        # Tool calls have already drained by the time uvicorn starts shutting down
+        timeout_graceful_shutdown=MCP_CLOSE_TIMEOUT,
+        log_level="info"
+    )
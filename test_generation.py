@@ -16,18 +16,24 @@ print("=" * 60)
 # Test generating a caption
 test_code = '''
 import os
+import asyncio
 os.chdir("/app")
 
-from server import generate_caption
-
-result = generate_caption(
-    topic="new Transylvanian burger with garlic sauce",
-    platform="instagram",
-    include_hashtags=True,
-    include_call_to_action=True
-)
-
-print(json.dumps(result, indent=2))
+from fastmcp import Client
+from server import mcp
+
+async def main():
+    # Tools are async - call them through an in-memory MCP client
+    async with Client(mcp) as client:
+        result = await client.call_tool("generate_caption", {
+            "topic": "new Transylvanian burger with garlic sauce",
+            "platform": "instagram",
+            "include_hashtags": True,
+            "include_call_to_action": True
+        })
+        print(result.content[0].text)
+
+asyncio.run(main())
 '''
 
 result = subprocess.run(